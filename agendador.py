@@ -0,0 +1,186 @@
+import os
+import gc
+import time
+from dataclasses import dataclass, field
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from multiprocessing import parent_process
+import pandas as pd
+from memoria import rss_mb, pico_rss_mb, executar_medindo, descrever
+from manifesto import arquivos_gerados
+from rastreio import ativar, ativo, trecho, descarregar, incorporar
+from perfil import perfilado
+
+#### DEFINIÇÃO DAS TAREFAS ####
+@dataclass
+class Resultado:
+    # Referência ao retorno de outra tarefa (ou a um item dele, se indice for informado)
+    tarefa: str
+    indice: int = None
+
+@dataclass
+class Tarefa:
+    nome: str
+    funcao: object
+    args: tuple = ()
+    kwargs: dict = field(default_factory=dict)
+
+    def dependencias(self):
+        valores = list(self.args) + list(self.kwargs.values())
+        return {valor.tarefa for valor in valores if isinstance(valor, Resultado)}
+
+def resolver(valor, resultados):
+    # Substitui as referências Resultado pelos retornos já calculados
+    if isinstance(valor, Resultado):
+        resultado = resultados[valor.tarefa]
+        return resultado if valor.indice is None else resultado[valor.indice]
+    return valor
+
+def executar_cronometrado(nome, funcao, args, kwargs, rastrear_memoria=False, rastrear=False, modo_perfil=None):
+    # Executada no processo de trabalho: roda a tarefa e mede o tempo e a memória gastos.
+    # Com rastrear, a tarefa vira um trecho do rastreio, devolvido junto com o resultado;
+    # com modo_perfil, grava o perfil da tarefa (ver perfil.py)
+    ativar(rastrear)
+    if modo_perfil:
+        funcao = perfilado(nome, funcao, modo_perfil)
+    inicio = time.perf_counter()
+    with trecho(nome, 'tarefa', funcao=funcao.__name__) as t:
+        if ativo():
+            t.registrar(linhas_entrada=sum(len(valor) for valor in args if isinstance(valor, pd.DataFrame)))
+        resultado, memoria = executar_medindo(funcao, args, kwargs, rastrear_memoria)
+        if ativo():
+            t.registrar(bytes_gravados=sum(os.path.getsize(arquivo) for arquivo in arquivos_gerados(resultado) if os.path.exists(arquivo)))
+    # Num processo de trabalho, os eventos seguem com o resultado para o processo principal
+    eventos = descarregar() if rastrear and parent_process() is not None else []
+    return resultado, time.perf_counter() - inicio, memoria, eventos
+
+#### EXECUÇÃO DAS TAREFAS ####
+def executar_tarefas(tarefas, max_processos=None, manifesto=None, limite_memoria_mb=None, rastrear_memoria=False, perfilar=None, modo_perfil='cprofile'):
+    nomes = [tarefa.nome for tarefa in tarefas]
+    if len(set(nomes)) != len(nomes):
+        raise ValueError("Há tarefas com nomes repetidos.")
+    for tarefa in tarefas:
+        faltantes = tarefa.dependencias() - set(nomes)
+        if faltantes:
+            raise ValueError(f"A tarefa '{tarefa.nome}' depende de tarefas inexistentes: {sorted(faltantes)}")
+
+    if max_processos is None:
+        max_processos = os.cpu_count() or 1
+
+    # Os processos de trabalho rastreiam as tarefas se o processo principal estiver rastreando
+    rastrear = ativo()
+
+    def deve_perfilar(tarefa):
+        # perfilar: nomes de tarefas ou de funções (vazio = todas); None = nenhuma
+        return perfilar is not None and (not perfilar or tarefa.nome in perfilar or tarefa.funcao.__name__ in perfilar)
+
+    def perfil_da(tarefa):
+        return modo_perfil if deve_perfilar(tarefa) else None
+
+    if limite_memoria_mb and rss_mb() is None:
+        print("Não há como medir a memória neste sistema (instale o psutil): limite de memória ignorado.")
+        limite_memoria_mb = None
+
+    resultados = {}
+    tempos = {}
+    memorias = {}
+    rss_processos = {}  # Último RSS informado por cada processo de trabalho
+    pendentes = list(tarefas)
+    em_execucao = {}
+    inicio = time.perf_counter()
+
+    # Com um único processo as tarefas rodam no próprio processo principal
+    executor = ProcessPoolExecutor(max_workers=max_processos) if max_processos > 1 else None
+
+    def memoria_em_uso():
+        # Processo principal mais os processos de trabalho
+        return rss_mb() + sum(rss_processos.values())
+
+    def liberar_memoria():
+        # Chamada sem tarefas em execução, quando a memória em uso passou do limite:
+        # troca os processos de trabalho por novos e, se ainda não bastar, interrompe
+        nonlocal executor
+        em_uso = memoria_em_uso()
+        if executor is not None:
+            print(f"Memória em uso ({em_uso:.0f} MB) acima do limite de {limite_memoria_mb} MB: reiniciando os processos de trabalho.")
+            executor.shutdown()
+            executor = ProcessPoolExecutor(max_workers=max_processos)
+            rss_processos.clear()
+        gc.collect()
+        em_uso = memoria_em_uso()
+        if em_uso >= limite_memoria_mb:
+            raise MemoryError(f"Memória em uso ({em_uso:.0f} MB) acima do limite de {limite_memoria_mb} MB.")
+
+    def concluir(tarefa, chave, impressao, resultado, segundos, memoria):
+        resultados[tarefa.nome] = resultado
+        tempos[tarefa.nome] = segundos
+        memorias[tarefa.nome] = memoria
+        if memoria['pid'] != os.getpid() and memoria['rss_mb'] is not None:
+            rss_processos[memoria['pid']] = memoria['rss_mb']
+        if manifesto is not None:
+            manifesto.registrar(chave, impressao, resultado)
+        print(f"[{len(resultados)}/{len(tarefas)}] {tarefa.nome}: {segundos:.2f}s{descrever(memoria)}")
+
+    try:
+        while pendentes or em_execucao:
+            # Despachar as tarefas cujas dependências já foram concluídas
+            prontas = [t for t in pendentes if t.dependencias() <= resultados.keys()]
+            for tarefa in prontas:
+                # Só há uma tarefa por processo em execução; as demais esperam a vez aqui
+                if executor is not None and len(em_execucao) >= max_processos:
+                    break
+
+                # Controle de admissão: acima do limite de memória, espera as tarefas em execução
+                if limite_memoria_mb and memoria_em_uso() >= limite_memoria_mb:
+                    if em_execucao:
+                        break
+                    liberar_memoria()
+
+                pendentes.remove(tarefa)
+                args = tuple(resolver(valor, resultados) for valor in tarefa.args)
+                kwargs = {chave: resolver(valor, resultados) for chave, valor in tarefa.kwargs.items()}
+
+                chave, impressao = None, None
+                if manifesto is not None:
+                    # Tarefas perfiladas são sempre executadas, mesmo com a imagem em dia
+                    chave, impressao, anterior = manifesto.consultar(tarefa.funcao, args, kwargs, reaproveitar=not deve_perfilar(tarefa))
+                    if anterior is not None:
+                        resultados[tarefa.nome] = anterior
+                        tempos[tarefa.nome] = 0.0
+                        continue
+
+                if executor is None:
+                    resultado, segundos, memoria, _ = executar_cronometrado(tarefa.nome, tarefa.funcao, args, kwargs, rastrear_memoria, rastrear, perfil_da(tarefa))
+                    concluir(tarefa, chave, impressao, resultado, segundos, memoria)
+                else:
+                    futuro = executor.submit(executar_cronometrado, tarefa.nome, tarefa.funcao, args, kwargs, rastrear_memoria, rastrear, perfil_da(tarefa))
+                    em_execucao[futuro] = (tarefa, chave, impressao)
+
+            if not em_execucao:
+                if pendentes and not prontas:
+                    raise ValueError(f"Dependência circular entre as tarefas: {[t.nome for t in pendentes]}")
+                continue
+
+            concluidos, _ = wait(em_execucao, return_when=FIRST_COMPLETED)
+            for futuro in concluidos:
+                tarefa, chave, impressao = em_execucao.pop(futuro)
+                resultado, segundos, memoria, eventos = futuro.result()
+                incorporar(eventos)
+                concluir(tarefa, chave, impressao, resultado, segundos, memoria)
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+        # Tarefas concluídas ficam no manifesto mesmo se outra falhar
+        if manifesto is not None:
+            manifesto.salvar_pendentes()
+
+    total = time.perf_counter() - inicio
+    soma = sum(tempos.values())
+    print(f"{len(tarefas)} tarefas em {total:.2f}s com {max_processos} processo(s) (soma dos tempos: {soma:.2f}s)")
+
+    # Resumo de memória: pico do processo principal e tarefa que terminou com o maior RSS
+    medidas = {nome: m['rss_mb'] for nome, m in memorias.items() if m['rss_mb'] is not None}
+    if medidas:
+        maior = max(medidas, key=medidas.get)
+        print(f"Pico de RSS do processo principal: {pico_rss_mb() or 0:.0f} MB; maior RSS ao fim de uma tarefa: {maior} ({medidas[maior]:.0f} MB)")
+
+    return resultados, tempos
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+
+# Dimensões indexadas: viram categorias e guardam as posições das linhas de cada valor
+CHAVES = ['PLANINFRA', 'STATUS', 'STATUS_PRAZO_PRJ', 'RESP_PRJ_Abr', 'RESP_Fisc_Abr']
+
+#### BASE INDEXADA ####
+class BaseIndexada:
+    # Base tratada com as dimensões-chave em categorias e, para cada valor de cada dimensão,
+    # as posições das suas linhas em ordem crescente. Os recortes consultam essas posições
+    # em vez de varrer a base com máscaras
+    def __init__(self, df, chaves=CHAVES):
+        self.chaves = [coluna for coluna in chaves if coluna in df.columns]
+        self.df = df.assign(**{coluna: df[coluna].astype('category') for coluna in self.chaves})
+
+        self.codigos = {}
+        self.posicoes_por_codigo = {}
+        for coluna in self.chaves:
+            codigos = self.df[coluna].cat.codes.to_numpy()
+            n_categorias = len(self.df[coluna].cat.categories)
+
+            # Ordenação estável pelo código (-1 = vazio): as linhas de cada valor ficam contíguas
+            # e em ordem crescente; o item 0 guarda as vazias e o item c + 1, as do código c
+            ordem = np.argsort(codigos, kind='stable')
+            contagem = np.bincount(codigos + 1, minlength=n_categorias + 1)
+            self.codigos[coluna] = codigos
+            self.posicoes_por_codigo[coluna] = np.split(ordem, np.cumsum(contagem)[:-1])
+
+    def __len__(self):
+        return len(self.df)
+
+    def codigos_de(self, coluna, valores):
+        # Códigos das categorias aceitas (valores ausentes da base são ignorados)
+        categorias = self.df[coluna].cat.categories
+        return [-1 if pd.isna(valor) else categorias.get_loc(valor)
+                for valor in valores if pd.isna(valor) or valor in categorias]
+
+    def posicoes(self, filtro):
+        # filtro: {coluna: valores aceitos}. Retorna as posições das linhas, em ordem crescente;
+        # um filtro de um só valor devolve o próprio vetor pré-calculado, sem cópia
+        if not filtro:
+            return np.arange(len(self.df))
+
+        aceitos = {}
+        for coluna, valores in filtro.items():
+            if coluna not in self.chaves:
+                raise ValueError(f"Filtro por '{coluna}' não suportado; use uma das colunas {self.chaves}")
+            aceitos[coluna] = self.codigos_de(coluna, valores)
+
+        # Partir da dimensão mais seletiva e conferir as demais só nas linhas que restaram
+        def tamanho(coluna):
+            return sum(len(self.posicoes_por_codigo[coluna][codigo + 1]) for codigo in aceitos[coluna])
+        coluna = min(aceitos, key=tamanho)
+
+        partes = [self.posicoes_por_codigo[coluna][codigo + 1] for codigo in aceitos[coluna]]
+        if not partes:
+            return np.empty(0, dtype=np.intp)
+        posicoes = partes[0] if len(partes) == 1 else np.sort(np.concatenate(partes))
+
+        for outra, codigos in aceitos.items():
+            if outra != coluna:
+                posicoes = posicoes[np.isin(self.codigos[outra][posicoes], codigos)]
+        return posicoes
+
+    def recortar(self, filtro):
+        # Linhas do filtro, na ordem da base (equivale a df[mascara])
+        return self.df.take(self.posicoes(filtro))
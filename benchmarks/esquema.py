@@ -0,0 +1,72 @@
+import os
+import sys
+import warnings
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto a partir da pasta benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sintetico import gerar_base_looker
+from get_data_pw import preparar_dados_pw
+from classificacao import classificar_prazos
+from helpers import resumo_justificativas, html_justificativas
+
+# Confere que as colunas tipadas no esquema aparecem nas tabelas como quando eram convertidas
+# a partir do texto da planilha, em cada recorte (python benchmarks/esquema.py; código 1 se
+# houver diferença)
+CICLO = 'PLANINFRA 2024/2025'
+
+def celulas_antigas(bruto, ids):
+    # Como o texto era tratado antes do esquema: %PRJ convertido só no recorte, demais colunas
+    # exibidas com f'{valor}' (células faltando viravam 'None')
+    recorte = bruto.set_index('ID-PW').loc[sorted(ids)]
+    return {
+        '%PRJ': pd.to_numeric(recorte['%PRJ'], errors='coerce').fillna(0).astype(str).tolist(),
+        'OM': [f'{valor}' for valor in recorte['OM']],
+        'Recurso': [f'{valor}' for valor in recorte['RECURSO']],
+        'Resp. proj.': [f'{valor}' for valor in recorte['RESPONSAVEL PROJETO']],
+    }
+
+def conferir(nome, bruto, df, mascara, falhas):
+    resumo = resumo_justificativas(df[mascara])
+    esperado = celulas_antigas(bruto, resumo['ID'])
+    for coluna, valores in esperado.items():
+        obtido = resumo[coluna].astype(str).tolist()
+        if obtido != valores:
+            diferentes = [(a, b) for a, b in zip(valores, obtido) if a != b][:3]
+            falhas.append(f"{nome}: coluna {coluna} difere (antes -> agora: {diferentes})")
+
+    # Barras de progresso inteiras quando o recorte não tem vazios
+    html = html_justificativas(resumo)
+    tem_vazios = (bruto.set_index('ID-PW').loc[resumo['ID'], '%PRJ'] == '').any()
+    if not tem_vazios and '.0%' in html:
+        falhas.append(f"{nome}: %PRJ decimal num recorte sem vazios")
+    print(f"{nome}: {len(resumo)} linhas, {'com' if tem_vazios else 'sem'} vazios no %PRJ")
+
+def main():
+    warnings.filterwarnings("ignore")
+    hoje = pd.Timestamp.today().normalize()
+    bruto = gerar_base_looker(1500, 0, hoje)
+    rng = np.random.default_rng(1)
+
+    # %PRJ vazio só em projetos fora do CICLO, e células faltando (linhas curtas do gspread)
+    # nas colunas exibidas
+    fora = bruto['INSCRIÇÃO'] != CICLO
+    bruto.loc[fora & (rng.random(len(bruto)) < 0.3), '%PRJ'] = ''
+    for coluna in ['OM', 'RECURSO', 'RESPONSAVEL PROJETO', 'DESCRIÇÃO']:
+        bruto[coluna] = bruto[coluna].astype(object).where(rng.random(len(bruto)) > 0.05, None)
+
+    df = classificar_prazos(preparar_dados_pw(bruto.copy()), hoje)
+    falhas = []
+    conferir('Ciclo 2024/2025', bruto, df, df['INSCRIÇÃO'] == CICLO, falhas)
+    conferir('Outros ciclos', bruto, df, df['INSCRIÇÃO'] != CICLO, falhas)
+    conferir('Base inteira', bruto, df, np.ones(len(df), dtype=bool), falhas)
+
+    for falha in falhas:
+        print(f"FALHA: {falha}")
+    if falhas:
+        sys.exit(1)
+    print("Tabelas iguais às da conversão a partir do texto.")
+
+if __name__ == '__main__':
+    main()
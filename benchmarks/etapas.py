@@ -0,0 +1,224 @@
+import os
+import io
+import sys
+import json
+import shutil
+import argparse
+import platform
+import tempfile
+import warnings
+import subprocess
+import contextlib
+import time
+from datetime import datetime
+import pandas as pd
+
+# Permite importar os módulos do projeto a partir da pasta benchmarks
+PROJETO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, PROJETO)
+from sintetico import gerar_base_looker
+from get_data_pw import preparar_dados_pw
+from classificacao import classificar_prazos
+from base_indexada import BaseIndexada
+from cubo import montar_cubo
+from agendador import executar_tarefas
+from relatorio import carregar_relatorio, ciclos_planinfra, criar_pastas, planejar_tarefas
+from renderizador import renderizador_disponivel
+
+# Tempo de cada etapa do relatório com dados sintéticos, em várias escalas. Cada execução entra
+# no histórico e é comparada com a linha de base (ex.: python benchmarks/etapas.py --linhas 1000)
+PASTA = os.path.dirname(os.path.abspath(__file__))
+HISTORICO = os.path.join(PASTA, 'historico.json')
+LINHA_BASE = os.path.join(PASTA, 'linha_base.json')
+
+# Diferenças abaixo disso (em segundos) são ruído, mesmo acima da tolerância
+RUIDO = 0.02
+
+# Funções criar_* que renderizam HTML: sem o wkhtmltoimage (ou o chromium, conforme
+# RENDERIZADOR_HTML), elas e a execução ponta a ponta são puladas
+FUNCOES_HTML = {'criar_resumo', 'criar_resumos_destaque', 'criar_barra_resp_prc_destaq',
+                'criar_justificativas', 'criar_lista_entregues'}
+
+#### MEDIÇÕES ####
+def cronometrar(funcao, repeticoes):
+    # Menor tempo entre as repetições (o menos afetado por ruído) e o último resultado
+    melhor = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        segundos = time.perf_counter() - inicio
+        melhor = segundos if melhor is None else min(melhor, segundos)
+    return resultado, melhor
+
+def indexar(df):
+    # Como em bqs.py: base indexada e cubo montado sobre ela
+    base = BaseIndexada(df)
+    return base, montar_cubo(base.df)
+
+def sem_html(tarefas):
+    # Retira as tarefas que renderizam HTML e as que dependem delas
+    removidas, mantidas = set(), []
+    for tarefa in tarefas:
+        if tarefa.funcao.__name__ in FUNCOES_HTML or tarefa.dependencias() & removidas:
+            removidas.add(tarefa.nome)
+        else:
+            mantidas.append(tarefa)
+    return mantidas
+
+def medir_etapas(linhas, relatorio, repeticoes, renderizar_html=True):
+    # Ingestão, colunas derivadas, índice/cubo e cada função criar_* (somando os ciclos)
+    agora = pd.Timestamp.today().normalize()
+    bruto = gerar_base_looker(linhas, 0, agora)
+    tempos = {}
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        df, tempos['esquema'] = cronometrar(lambda: preparar_dados_pw(bruto.copy()), repeticoes)
+        df = df[df['INSCRIÇÃO'] != 'Encerrado']
+        df, tempos['classificar_prazos'] = cronometrar(lambda: classificar_prazos(df, agora, ciclos_planinfra(relatorio)), repeticoes)
+        (base, cubo), tempos['indice_e_cubo'] = cronometrar(lambda: indexar(df), repeticoes)
+
+        por_funcao = {}
+        for _ in range(repeticoes):
+            tarefas = planejar_tarefas(relatorio, base, cubo, False, agora)
+            if not renderizar_html:
+                tarefas = sem_html(tarefas)
+            _, tempos_tarefas = executar_tarefas(tarefas, max_processos=1)
+            soma = {}
+            for tarefa in tarefas:
+                nome = tarefa.funcao.__name__
+                soma[nome] = soma.get(nome, 0.0) + tempos_tarefas[tarefa.nome]
+            for nome, segundos in soma.items():
+                por_funcao[nome] = min(por_funcao.get(nome, segundos), segundos)
+        tempos.update(por_funcao)
+
+    return tempos
+
+def medir_ponta_a_ponta(linhas, caminho_relatorio, repeticoes):
+    # bqs.py completo num processo novo, lendo dados sintéticos e refazendo todas as imagens
+    ambiente = dict(os.environ, FONTE_DADOS=f'sintetico:{linhas}', RELATORIO=caminho_relatorio,
+                    RENDERIZAR_TUDO='1')
+
+    def executar():
+        processo = subprocess.run([sys.executable, os.path.join(PROJETO, 'bqs.py')], env=ambiente,
+                                  capture_output=True, text=True)
+        if processo.returncode != 0:
+            raise RuntimeError(f"bqs.py terminou com código {processo.returncode}:\n{processo.stdout[-2000:]}{processo.stderr[-2000:]}")
+
+    return cronometrar(executar, repeticoes)[1]
+
+#### HISTÓRICO E LINHA DE BASE ####
+def ler_json(caminho, padrao):
+    if not os.path.exists(caminho):
+        return padrao
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def gravar_json(caminho, dados):
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(dados, f, indent=2, ensure_ascii=False)
+    os.replace(caminho + '.tmp', caminho)
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=PROJETO, capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+def regressoes(resultados, linha_base, tolerancia):
+    # Etapas mais lentas que a linha de base além da tolerância (ex.: 0.2 = 20%)
+    encontradas = []
+    for linhas, tempos in resultados.items():
+        for etapa, segundos in tempos.items():
+            anterior = linha_base.get(linhas, {}).get(etapa)
+            if anterior is not None and segundos > anterior * (1 + tolerancia) and segundos - anterior > RUIDO:
+                encontradas.append((linhas, etapa, anterior, segundos))
+    return encontradas
+
+def imprimir_tabela(resultados, linha_base):
+    escalas = list(resultados)
+    etapas = list(dict.fromkeys(etapa for tempos in resultados.values() for etapa in tempos))
+    largura = max(len(etapa) for etapa in etapas) + 2
+    print('Etapa'.ljust(largura) + ''.join(f'{linhas + " linhas":>24}' for linhas in escalas))
+    for etapa in etapas:
+        celulas = []
+        for linhas in escalas:
+            segundos = resultados[linhas].get(etapa)
+            anterior = linha_base.get(linhas, {}).get(etapa)
+            texto = '' if segundos is None else f'{segundos:.3f}s'
+            if segundos is not None and anterior:
+                texto += f' ({(segundos / anterior - 1) * 100:+.0f}%)'
+            celulas.append(f'{texto:>24}')
+        print(etapa.ljust(largura) + ''.join(celulas))
+
+#### EXECUÇÃO ####
+def main():
+    parser = argparse.ArgumentParser(description='Tempo de cada etapa do relatório com dados sintéticos.')
+    parser.add_argument('--linhas', default='1000,10000,100000', help='escalas, separadas por vírgula')
+    parser.add_argument('--repeticoes', type=int, default=3, help='repetições de cada medição (vale a menor)')
+    parser.add_argument('--relatorio', default=os.path.join(PROJETO, 'relatorio.json'))
+    parser.add_argument('--sem-ponta-a-ponta', action='store_true', help='não executar o bqs.py completo')
+    parser.add_argument('--tolerancia', type=float, default=0.2, help='aumento tolerado sobre a linha de base (0.2 = 20%%)')
+    parser.add_argument('--historico', default=HISTORICO)
+    parser.add_argument('--linha-base', default=LINHA_BASE)
+    parser.add_argument('--gravar-linha-base', action='store_true', help='usar esta execução como nova linha de base')
+    args = parser.parse_args()
+
+    warnings.filterwarnings("ignore")
+    args.relatorio = os.path.abspath(args.relatorio)
+    relatorio = carregar_relatorio(args.relatorio)
+    linha_base = ler_json(args.linha_base, {})
+
+    renderizar_html = renderizador_disponivel()
+    if not renderizar_html:
+        print("Renderizador HTML indisponível (wkhtmltoimage fora do PATH?): as funções que geram "
+              "tabelas HTML e a execução ponta a ponta não serão medidas.")
+
+    # As funções criar_* gravam em outputs/ e leem mapa_branco.png a partir da pasta atual
+    pasta_trabalho = tempfile.mkdtemp(prefix='bqs_benchmark_')
+    shutil.copy(os.path.join(PROJETO, 'mapa_branco.png'), pasta_trabalho)
+    diretorio_original = os.getcwd()
+    os.chdir(pasta_trabalho)
+
+    resultados = {}
+    try:
+        criar_pastas(relatorio, 'outputs')
+        for linhas in [int(valor) for valor in args.linhas.split(',')]:
+            print(f"Medindo {linhas} linhas...")
+            tempos = medir_etapas(linhas, relatorio, args.repeticoes, renderizar_html)
+            if renderizar_html and not args.sem_ponta_a_ponta:
+                tempos['ponta_a_ponta'] = medir_ponta_a_ponta(linhas, args.relatorio, args.repeticoes)
+            resultados[str(linhas)] = tempos
+    finally:
+        os.chdir(diretorio_original)
+        shutil.rmtree(pasta_trabalho, ignore_errors=True)
+
+    imprimir_tabela(resultados, linha_base)
+
+    historico = ler_json(args.historico, [])
+    historico.append({
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeticoes': args.repeticoes,
+        'resultados': resultados,
+    })
+    gravar_json(args.historico, historico)
+    print(f"Resultados adicionados a {args.historico}.")
+
+    if args.gravar_linha_base:
+        gravar_json(args.linha_base, {**linha_base, **resultados})
+        print(f"Linha de base gravada em {args.linha_base}.")
+        return
+
+    encontradas = regressoes(resultados, linha_base, args.tolerancia)
+    for linhas, etapa, anterior, segundos in encontradas:
+        print(f"REGRESSÃO: {etapa} com {linhas} linhas: {anterior:.3f}s -> {segundos:.3f}s")
+    if encontradas:
+        sys.exit(1)
+    if linha_base:
+        print("Nenhuma regressão em relação à linha de base.")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+import os
+import sys
+import glob
+import time
+import numpy as np
+from PIL import Image
+
+# Permite importar os módulos do projeto a partir da pasta benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from helpers import remover_fundo_branco
+
+# Implementação anterior (pixel a pixel), mantida apenas como referência de comparação
+def remove_white_background(image):
+    image = image.convert("RGBA")
+    data = image.getdata()
+
+    new_data = []
+    for item in data:
+        if item[0] > 200 and item[1] > 200 and item[2] > 200:
+            new_data.append((255, 255, 255, 0))
+        else:
+            new_data.append(item)
+
+    image.putdata(new_data)
+    return image
+
+def main():
+    # Pizzas geradas por criar_barra_resp_prj/obr/prospec
+    pizzas = sorted(glob.glob(os.path.join('outputs', 'mapas', 'pizzas', '*.png')))
+    if not pizzas:
+        print("Nenhuma pizza encontrada em outputs/mapas/pizzas.")
+        return
+
+    imagens = [Image.open(pizza).convert("RGBA") for pizza in pizzas]
+    total_pixels = sum(img.width * img.height for img in imagens)
+
+    inicio = time.perf_counter()
+    antigas = [remove_white_background(img) for img in imagens]
+    tempo_antigo = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    novas = [remover_fundo_branco(img) for img in imagens]
+    tempo_novo = time.perf_counter() - inicio
+
+    # Conferir que o resultado é idêntico ao da versão pixel a pixel
+    iguais = all(np.array_equal(np.array(a), np.array(b)) for a, b in zip(antigas, novas))
+
+    print(f"{len(imagens)} pizzas, {total_pixels / 1e6:.1f} Mpixels")
+    print(f"Pixel a pixel: {tempo_antigo:.2f}s")
+    print(f"Vetorizado:    {tempo_novo:.2f}s ({tempo_antigo / tempo_novo:.0f}x mais rápido)")
+    print(f"Resultados idênticos: {'sim' if iguais else 'não'}")
+
+if __name__ == '__main__':
+    main()
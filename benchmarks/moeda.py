@@ -0,0 +1,80 @@
+import os
+import sys
+import time
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto a partir da pasta benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from moeda import ler_brl, formatar_brl
+
+# Implementações anteriores (valor a valor), mantidas apenas como referência de comparação
+def ler_valor_antigo(serie):
+    serie = serie.str.replace('R$ ', '')
+    serie = serie.str.replace('.', '')
+    serie = serie.str.replace(',', '.')
+    return pd.to_numeric(serie, errors='coerce')
+
+def formatar_valor_antigo(serie):
+    return serie.apply(lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", "."))
+
+# Casos de borda: vazios e não finitos, negativos e zero com sinal, meio centavo (e valores
+# logo acima/abaixo dele), milhares e valores enormes
+CASOS = [np.nan, np.inf, -np.inf, 0.0, -0.0, -0.004, -0.005, -0.006, -1.005, -1234.565, -1e12,
+         0.005, 0.015, 0.025, 0.125, 1.005, 2.675, 1.0049999999, 1.0050000001, 999.995, 1000.0,
+         1234567.895, 1e15, 1e16, 123456789012345.67, 1.7976931348623157e308]
+
+def cronometrar(funcao, serie):
+    inicio = time.perf_counter()
+    resultado = funcao(serie)
+    return resultado, time.perf_counter() - inicio
+
+def diferencas(antigos, novos, entradas):
+    # Posições em que as duas implementações discordam (NaN igual a NaN)
+    iguais = (antigos == novos) | (antigos.isna() & novos.isna())
+    return [(entradas.iloc[i], antigos.iloc[i], novos.iloc[i]) for i in np.flatnonzero(~iguais.to_numpy())]
+
+def main():
+    # Confere formatar_brl e ler_brl com as implementações valor a valor (código 1 se houver
+    # diferença) e mede o ganho (python benchmarks/moeda.py [n])
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    rng = np.random.default_rng(0)
+
+    # Valores típicos, negativos, todos os meios centavos até 10 e os casos de borda
+    valores = np.concatenate([
+        rng.uniform(0, 1e8, n),
+        rng.uniform(-1e10, 1e10, n // 10),
+        np.arange(0, 10, 0.005),
+        -np.arange(0, 10, 0.005),
+        CASOS,
+    ])
+    numeros = pd.Series(valores)
+    falhas = []
+
+    antigos, tempo_antigo = cronometrar(formatar_valor_antigo, numeros)
+    novos, tempo_novo = cronometrar(formatar_brl, numeros)
+    falhas += [f"formatar_brl({valor!r}): {antigo!r} -> {novo!r}" for valor, antigo, novo in diferencas(antigos, novos, numeros)]
+    print(f"Formatação de {len(numeros)} valores")
+    print(f"Valor a valor: {tempo_antigo * 1000:.0f} ms")
+    print(f"Vetorizado:    {tempo_novo * 1000:.0f} ms ({tempo_antigo / tempo_novo:.1f}x mais rápido)")
+
+    # Textos no formato da planilha (os finitos, já formatados), com células vazias e inválidas
+    textos = antigos[np.isfinite(valores)].where(rng.random(np.isfinite(valores).sum()) > 0.05, '')
+    textos = pd.concat([textos, pd.Series(['', 'R$ ', 'abc', 'R$ -0,00', 'R$ 1.234,5', '1.234,56', None])], ignore_index=True)
+
+    antigos, tempo_antigo = cronometrar(ler_valor_antigo, textos)
+    novos, tempo_novo = cronometrar(ler_brl, textos)
+    falhas += [f"ler_brl({texto!r}): {antigo!r} -> {novo!r}" for texto, antigo, novo in diferencas(antigos, novos, textos)]
+    print(f"Leitura de {len(textos)} valores")
+    print(f"Valor a valor: {tempo_antigo * 1000:.0f} ms")
+    print(f"Vetorizado:    {tempo_novo * 1000:.0f} ms ({tempo_antigo / tempo_novo:.1f}x mais rápido)")
+
+    for falha in falhas[:20]:
+        print(f"FALHA: {falha}")
+    if falhas:
+        print(f"{len(falhas)} diferença(s) em relação à implementação valor a valor.")
+        sys.exit(1)
+    print("Resultados idênticos à implementação valor a valor.")
+
+if __name__ == '__main__':
+    main()
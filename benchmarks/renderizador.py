@@ -0,0 +1,58 @@
+import os
+import io
+import sys
+import time
+from PIL import Image
+
+# Permite importar os módulos do projeto a partir da pasta benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from renderizador import RENDERIZADORES
+
+# Teste de fumaça dos backends HTML -> PNG: cada backend disponível neste sistema converte uma
+# tabela e um lote, e o PNG precisa ter a largura pedida (python benchmarks/renderizador.py;
+# código 1 se algum falhar). Backends indisponíveis são pulados
+TABELA = ('<html><head><meta charset="utf-8"></head><body><table class="main-table">'
+          '<thead><tr><th>ID</th><th>Descrição</th></tr></thead><tbody>'
+          + ''.join(f'<tr><td>{i}</td><td>Projeto {i} – ação</td></tr>' for i in range(20))
+          + '</tbody></table></body></html>')
+
+def conferir_png(png, largura):
+    imagem = Image.open(io.BytesIO(png))
+    imagem.load()
+    if imagem.format != 'PNG' or imagem.width != largura or imagem.height < 50:
+        raise ValueError(f"PNG inesperado: {imagem.format} {imagem.width}x{imagem.height} (largura pedida: {largura})")
+
+def testar(nome, classe):
+    renderizador = classe()
+    try:
+        inicio = time.perf_counter()
+        conferir_png(renderizador.para_png(TABELA, 500), 500)
+        unica = time.perf_counter() - inicio
+
+        inicio = time.perf_counter()
+        pngs = renderizador.lote_para_png([(TABELA, 500), (TABELA, 700), (TABELA, 500)])
+        lote = time.perf_counter() - inicio
+        if len(pngs) != 3:
+            raise ValueError(f"O lote devolveu {len(pngs)} imagens em vez de 3")
+        for png, largura in zip(pngs, [500, 700, 500]):
+            conferir_png(png, largura)
+    finally:
+        renderizador.fechar()
+    print(f"{nome}: ok (uma tabela em {unica * 1000:.0f} ms, lote de 3 em {lote * 1000:.0f} ms)")
+
+def main():
+    falhas = []
+    for nome, classe in RENDERIZADORES.items():
+        if not classe.disponivel():
+            print(f"{nome}: pulado (indisponível neste sistema)")
+            continue
+        try:
+            testar(nome, classe)
+        except Exception as erro:
+            falhas.append(nome)
+            print(f"{nome}: FALHA: {str(erro).splitlines()[0]}")
+    if falhas:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
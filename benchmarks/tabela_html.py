@@ -0,0 +1,100 @@
+import os
+import sys
+import time
+import warnings
+import numpy as np
+import pandas as pd
+
+# Permite importar os módulos do projeto a partir da pasta benchmarks
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from sintetico import gerar_base_looker
+from get_data_pw import preparar_dados_pw
+from classificacao import classificar_prazos
+from helpers import resumo_justificativas, html_justificativas, html_lista_entregues
+from tabela_html import celulas, celulas_indicador, celulas_progresso, montar_tabela
+
+# Implementações anteriores (iterrows e concatenação), mantidas apenas como referência de comparação
+def tabela_justificativas_antiga(summary_df):
+    html_table = '<table class="main-table"><thead><tr>'
+    html_table += ''.join(f'<th>{col}</th>' for col in summary_df.columns)
+    html_table += '</tr></thead><tbody>'
+    for index, row in summary_df.iterrows():
+        html_table += '<tr>'
+        for col in summary_df.columns:
+            if col in ['CN', 'ETPE', 'TAP', 'TEP']:
+                if row[col] == 1:
+                    html_table += f'<td class="cn-blue">{row[col]}</td>'
+                elif row[col] == 0:
+                    html_table += f'<td class="cn-red">{row[col]}</td>'
+                else:
+                    html_table += f'<td>{row[col]}</td>'
+            elif col == '%PRJ':
+                percent = row[col]
+                html_table += f'''
+                <td>
+                    <div class="progress-bar">
+                        <div class="progress-bar-fill" style="width: {percent}%;">{percent}%</div>
+                    </div>
+                </td>'''
+            else:
+                html_table += f'<td>{row[col]}</td>'
+        html_table += '</tr>'
+    html_table += '</tbody></table>'
+    return html_table
+
+def tabela_justificativas_nova(summary_df):
+    colunas = []
+    for col in summary_df.columns:
+        if col in ['CN', 'ETPE', 'TAP', 'TEP']:
+            colunas.append(celulas_indicador(summary_df[col]))
+        elif col == '%PRJ':
+            colunas.append(celulas_progresso(summary_df[col]))
+        else:
+            colunas.append(celulas(summary_df[col]))
+    return montar_tabela(colunas, summary_df.columns)
+
+def tabela_entregues_antiga(summary_df):
+    html_table = "<table class='main-table'><thead><tr><th>ID-PW</th><th>DESCRIÇÃO</th><th>OM</th></tr></thead><tbody>"
+    for _, row in summary_df.iterrows():
+        class_name = row['destacar']
+        html_table += f"<tr class='{class_name}'><td>{row['ID-PW']}</td><td>{row['DESCRIÇÃO']}</td><td>{row['OM']}</td></tr>"
+    html_table += "</tbody></table>"
+    return html_table
+
+def tabela_entregues_nova(summary_df):
+    colunas = [celulas(summary_df[col]) for col in ['ID-PW', 'DESCRIÇÃO', 'OM']]
+    aberturas = "<tr class='" + summary_df['destacar'].to_numpy(dtype=object) + "'>"
+    return montar_tabela(colunas, ['ID-PW', 'DESCRIÇÃO', 'OM'], abertura="<table class='main-table'>", aberturas_linhas=aberturas)
+
+def cronometrar(funcao, *args):
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    return resultado, time.perf_counter() - inicio
+
+def comparar(nome, antiga, nova, *args):
+    antigo, tempo_antigo = cronometrar(antiga, *args)
+    novo, tempo_novo = cronometrar(nova, *args)
+    print(nome)
+    print(f"iterrows:      {tempo_antigo * 1000:.0f} ms")
+    print(f"Por coluna:    {tempo_novo * 1000:.0f} ms ({tempo_antigo / tempo_novo:.1f}x mais rápido)")
+    print(f"HTML idêntico: {'sim' if antigo == novo else 'não'}")
+
+def main():
+    warnings.filterwarnings("ignore")
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    hoje = pd.Timestamp.today()
+    df = classificar_prazos(preparar_dados_pw(gerar_base_looker(n)), hoje)
+
+    summary_df = resumo_justificativas(df)
+    comparar(f"Justificativas ({len(summary_df)} linhas)", tabela_justificativas_antiga, tabela_justificativas_nova, summary_df)
+
+    destacar = np.where(df['DATA de assinatura do TEP pelo cliente'] > hoje - pd.Timedelta(days=30), 'destacar', '')
+    entregues = df[['ID-PW', 'DESCRIÇÃO', 'OM']].assign(destacar=destacar)
+    comparar(f"Entregues ({len(entregues)} linhas)", tabela_entregues_antiga, tabela_entregues_nova, entregues)
+
+    # As tabelas completas saem no fim do HTML gerado em helpers
+    iguais = html_justificativas(summary_df).endswith(tabela_justificativas_nova(summary_df)) and html_lista_entregues(df, hoje).endswith(tabela_entregues_nova(entregues))
+    print(f"helpers usa as tabelas novas: {'sim' if iguais else 'não'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+import pandas as pd
+import numpy as np
+from datetime import datetime, timedelta
+from rastreio import rastreado
+
+# Status agrupados conforme as regras de prazo de projeto
+STATUS_CANCELADOS = ['PCN', 'PSP', 'PII']
+STATUS_CONCLUIDOS = ['PRC', 'LIA', 'OBI', 'OBC', 'OSP', 'OCN']
+
+# Descrição do status de prazo para cada código
+DESCRICAO_PRAZO = {
+    0: "Prazo Ausente",
+    1: "Prazo Expirado",
+    2: "Projeto não iniciado (pelo PTA deveria)",
+    3: "Prazo do projeto encerrando (30d)",
+    4: "TEP não assinado (+30d)",
+    5: "Projeto em andamento",
+    6: "Aguardando início de projeto",
+    7: "Projeto concluído",
+    8: "Projeto concluído",
+    9: "Projeto cancelado ou suspenso",
+}
+
+# Ícone exibido na coluna PRAZO PRJ para cada código
+ICONE_PRAZO = {
+    0: "💥",
+    1: "💥",
+    2: "🔴",
+    3: "⚠️",
+    4: "🟡",
+    5: "📈",
+    6: "⏳",
+    7: "✅",
+    8: "✅",
+    9: "⛔",
+}
+
+# Códigos cuja coluna PRAZO PRJ traz também a data do prazo
+CODIGOS_COM_DATA = [1, 2, 3, 4, 5, 6, 7]
+
+# Ciclos do PLANINFRA, na ordem em que são testados na coluna INSCRIÇÃO
+CICLOS_PLANINFRA = [
+    ('2024/2025', 'PLANINFRA 2024/2025'),
+    ('2023/2024', 'PLANINFRA 2023/2024'),
+    ('2025/2026', 'PLANINFRA 2025/2026'),
+]
+
+@rastreado(categoria='colunas')
+def prazo_vigente_pta(df, hoje):
+    # Prazo vigente; sem ele, o término do PTA; sem término do PTA, a data de referência
+    prazo = df['PRAZO PROJETO VIGENTE']
+    termino = df['TÉRMINO_PTA']
+    prazo_pta = prazo.mask(prazo.isna() & termino.notna(), termino)
+    return prazo_pta.mask(termino.isna(), hoje)
+
+@rastreado(categoria='colunas')
+def codigo_prazo(df, prazo_pta, agora):
+    # Código do prazo de cada projeto (ver DESCRICAO_PRAZO) pelas regras de cada STATUS;
+    # vale a primeira condição verdadeira
+    hoje = agora.normalize()
+    status = df['STATUS']
+    entrega = df['Data de entrega do Projeto']
+
+    concluido = status.isin(STATUS_CONCLUIDOS)
+    pri = status == 'PRI'
+    agd = status == 'AGD'
+
+    condicoes = [
+        status.isin(STATUS_CANCELADOS),
+        concluido & prazo_pta.isna(),
+        concluido,
+        pri & (entrega + timedelta(days=30) < agora - timedelta(days=1)),
+        pri & (prazo_pta < hoje - timedelta(days=1)) & entrega.isna(),
+        pri & (prazo_pta < hoje + timedelta(days=29)),
+        pri,
+        agd & (df['INÍCIO_PTA'] < agora),
+        agd,
+    ]
+    codigos = [9, 8, 7, 4, 1, 3, 5, 2, 6]
+    return pd.Series(np.select(condicoes, codigos, default=9), index=df.index)
+
+@rastreado(categoria='colunas')
+def texto_prazo(codigo, prazo_pta):
+    # Ícone do código, seguido da data do prazo nos códigos de CODIGOS_COM_DATA
+    icone = codigo.map(ICONE_PRAZO)
+    com_data = icone + ' ' + prazo_pta.dt.strftime('%Y-%m-%d').fillna('NaT')
+    return com_data.where(codigo.isin(CODIGOS_COM_DATA), icone)
+
+@rastreado(categoria='colunas')
+def ciclo_planinfra(inscricao, ciclos=CICLOS_PLANINFRA):
+    # Primeiro ciclo cujo trecho aparece na INSCRIÇÃO; sem nenhum, 'Anterior a 2023'
+    condicoes = [inscricao.str.contains(trecho, regex=False, na=False) for trecho, _ in ciclos]
+    rotulos = [rotulo for _, rotulo in ciclos]
+    return pd.Series(np.select(condicoes, rotulos, default='Anterior a 2023'), index=inscricao.index)
+
+@rastreado(categoria='colunas')
+def classificar_prazos(df, agora=None, ciclos=CICLOS_PLANINFRA):
+    # Cria as colunas derivadas de prazo e PLANINFRA em uma única passada,
+    # usando o mesmo instante de referência para todas as regras
+    if agora is None:
+        agora = datetime.today()
+    agora = pd.Timestamp(agora)
+
+    prazo_pta = prazo_vigente_pta(df, agora.normalize())
+    codigo = codigo_prazo(df, prazo_pta, agora)
+
+    df['PRAZO PROJETO VIGENTE + PTA'] = prazo_pta
+    df['COD_PRAZO_PRJ'] = codigo
+    df['STATUS_PRAZO_PRJ'] = codigo.map(DESCRICAO_PRAZO)
+    df['PRAZO PRJ'] = texto_prazo(codigo, prazo_pta)
+    df['PLANINFRA'] = ciclo_planinfra(df['INSCRIÇÃO'], ciclos)
+
+    return df
@@ -0,0 +1,51 @@
+import numpy as np
+
+# Dimensões pelas quais os resumos e gráficos de barras recortam a base
+DIMENSOES = ['PLANINFRA', 'STATUS', 'STATUS_Ext', 'RESP_PRJ_Abr', 'RESP_Fisc_Abr', 'STATUS_PRAZO_PRJ']
+
+#### CUBO DE AGREGAÇÃO ####
+def montar_cubo(df):
+    # Uma linha por combinação das dimensões (inclusive vazias), com a quantidade de projetos,
+    # a soma do VALOR e o Ordem_Status da primeira linha da combinação. As combinações ficam
+    # na ordem em que aparecem no df, o que preserva a ordem de empates do value_counts.
+    # Dimensões em categorias geram só as combinações presentes (observed=True)
+    base = df[DIMENSOES + ['VALOR']].assign(Primeira_Linha=np.arange(len(df)))
+    cubo = base.groupby(DIMENSOES, sort=False, dropna=False, observed=True).agg(
+        Quantidade=('Primeira_Linha', 'size'),
+        VALOR=('VALOR', 'sum'),
+        Primeira_Linha=('Primeira_Linha', 'min'),
+    ).reset_index()
+
+    cubo['Ordem_Status'] = df['Ordem_Status'].to_numpy()[cubo['Primeira_Linha'].to_numpy()]
+    return cubo
+
+#### LEITURAS DO CUBO ####
+def contar(cubo, coluna):
+    # Equivalente a df[coluna].value_counts()
+    return cubo.groupby(coluna, sort=False, observed=True)['Quantidade'].sum().sort_values(ascending=False)
+
+def contar_por(cubo, linhas, colunas):
+    # Equivalente a df.groupby([linhas, colunas]).size().unstack(fill_value=0)
+    return cubo.groupby([linhas, colunas], observed=True)['Quantidade'].sum().unstack(fill_value=0)
+
+def somar(cubo, coluna):
+    # Equivalente a df.groupby(coluna)['VALOR'].sum()
+    return cubo.groupby(coluna, observed=True)['VALOR'].sum()
+
+def ordem_status(cubo, coluna):
+    # Ordem_Status da primeira linha de cada valor da coluna (como df.drop_duplicates(coluna))
+    return cubo.drop_duplicates(coluna).set_index(coluna)['Ordem_Status']
+
+def agrupar_outros(df, coluna, lista_inclusao):
+    # Valores da coluna fora da lista passam a ser 'OUTROS' (serve para o cubo e para a base).
+    # A coluna volta a ser texto: 'OUTROS' ordena entre os demais valores, como na base sem categorias
+    df = df.copy()  # Não alterar o DataFrame recebido
+    valores = df[coluna].astype(object)
+    df[coluna] = valores.where(valores.isin(lista_inclusao), 'OUTROS')
+    return df
+
+def resumo_por_status(cubo):
+    # Quantidade, soma do VALOR e Ordem_Status por STATUS_Ext, em ordem alfabética
+    resumo = cubo.groupby('STATUS_Ext', observed=True).agg(Quantidade=('Quantidade', 'sum'), VALOR=('VALOR', 'sum'))
+    resumo['Ordem_Status'] = ordem_status(cubo, 'STATUS_Ext')
+    return resumo.reset_index()
@@ -0,0 +1,50 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from pandas.tseries.api import guess_datetime_format
+
+# Formato das datas da planilha
+FORMATO_PLANILHA = '%d/%m/%Y'
+
+# Formatos já inferidos por coluna, reaproveitados nas próximas leituras (ex.: snapshot, blocos)
+FORMATOS_INFERIDOS = {}
+
+#### DATA DE REFERÊNCIA ####
+def data_referencia(texto=None):
+    # Instante usado por todas as regras de prazo: a data informada (aaaa-mm-dd, para
+    # reproduzir uma execução passada) ou o momento atual
+    if texto:
+        return pd.Timestamp(datetime.strptime(texto, '%Y-%m-%d'))
+    return pd.Timestamp(datetime.today())
+
+#### LEITURA DAS DATAS ####
+def inferir_formato(coluna, valores):
+    # Formato do primeiro valor preenchido (dia primeiro), guardado para a coluna
+    if coluna in FORMATOS_INFERIDOS:
+        return FORMATOS_INFERIDOS[coluna]
+    preenchidos = [valor for valor in valores if str(valor).strip()]
+    formato = guess_datetime_format(str(preenchidos[0]), dayfirst=True) if preenchidos else None
+    if formato is not None:
+        FORMATOS_INFERIDOS[coluna] = formato
+    return formato
+
+def ler_datas(serie, formato=None):
+    # Converte a coluna para datetime64 uma única vez, analisando só os valores distintos.
+    # Com formato, valores fora dele geram erro; sem formato, ele é inferido e os valores
+    # que não o seguirem são lidos com dia primeiro (inválidos ficam vazios)
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+
+    codigos, unicos = pd.factorize(serie)
+    unicos = pd.Series(unicos, dtype=object)
+    if formato is not None:
+        datas = pd.to_datetime(unicos, format=formato)
+    else:
+        formato = inferir_formato(serie.name, unicos)
+        datas = pd.to_datetime(unicos, format=formato, errors='coerce') if formato else pd.Series(pd.NaT, index=unicos.index)
+        restantes = datas.isna() & (unicos.astype(str).str.strip() != '')
+        if restantes.any():
+            datas[restantes] = pd.to_datetime(unicos[restantes], errors='coerce', dayfirst=True, format='mixed')
+
+    valores = np.append(datas.to_numpy(dtype='datetime64[ns]'), np.datetime64('NaT', 'ns'))
+    return pd.Series(valores[codigos], index=serie.index, name=serie.name)
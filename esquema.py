@@ -0,0 +1,108 @@
+import pandas as pd
+from moeda import ler_brl
+from datas import ler_datas, FORMATO_PLANILHA
+from rastreio import rastreado
+
+#### ESQUEMA DA ABA base_looker ####
+# Colunas usadas pelo relatório e o tipo de cada uma; as demais colunas da planilha são descartadas
+ESQUEMA_BASE_LOOKER = {
+    'ID-PW': 'texto',
+    'INSCRIÇÃO': 'categoria',
+    'STATUS': 'categoria',
+    'STATUS_Ext': 'categoria',
+    'Ordem_Status': 'numero',
+    'VALOR': 'moeda',
+    'Data de entrega do Projeto': 'data',
+    'INÍCIO_PTA': 'data',
+    'TÉRMINO_PTA': 'data',
+    'PRAZO PROJETO VIGENTE': 'data',
+    'DATA de assinatura do TEP pelo cliente': 'data_livre',
+    'OM': 'rotulo',
+    'DESCRIÇÃO': 'texto',
+    'CN': 'inteiro',
+    'ETPE': 'inteiro',
+    'TAP ass': 'inteiro',
+    'TEP ass': 'inteiro',
+    'RECURSO': 'rotulo',
+    'RESPONSAVEL PROJETO': 'rotulo',
+    'Justificativa': 'texto',
+    '%PRJ': 'inteiro',
+    'RESP_PRJ_Abr': 'categoria',
+    'RESP_Fisc_Abr': 'categoria',
+}
+
+#### CONVERSÕES ####
+# Todas aceitam colunas já convertidas (ex.: snapshots locais), que ficam como estão
+
+def para_texto(serie):
+    return serie
+
+def para_categoria(serie):
+    return serie.astype('category')
+
+def para_rotulo(serie):
+    # Categoria só exibida nas tabelas: células faltando (linhas curtas da planilha) aparecem
+    # como o texto 'None', como antes da conversão, em vez de virarem NaN
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie
+    return serie.astype(str).astype('category')
+
+def para_numero(serie):
+    # Inteiro se todos os valores forem inteiros, decimal se houver vazios ou frações
+    return pd.to_numeric(serie, errors='coerce')
+
+def para_inteiro(serie):
+    # Inteiro com vazios (Int64); mantém decimal se houver frações
+    numeros = pd.to_numeric(serie, errors='coerce')
+    return numeros.astype('Int64') if (numeros.dropna() % 1 == 0).all() else numeros
+
+def para_moeda(serie):
+    # Valores no formato 'R$ 1.234,56'
+    if pd.api.types.is_numeric_dtype(serie):
+        return serie
+    return ler_brl(serie)
+
+def para_data(serie):
+    # Datas no formato dd/mm/aaaa
+    return ler_datas(serie, FORMATO_PLANILHA)
+
+def para_data_livre(serie):
+    # Datas digitadas à mão: formato inferido, dia primeiro, valores inválidos ficam vazios
+    return ler_datas(serie)
+
+CONVERSORES = {
+    'texto': para_texto,
+    'categoria': para_categoria,
+    'rotulo': para_rotulo,
+    'numero': para_numero,
+    'inteiro': para_inteiro,
+    'moeda': para_moeda,
+    'data': para_data,
+    'data_livre': para_data_livre,
+}
+
+#### APLICAÇÃO DO ESQUEMA ####
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / 2**20
+
+def sem_categorias(esquema):
+    # Mesmo esquema com as categorias mantidas como texto (para blocos que ainda serão juntados:
+    # categorias diferentes em cada bloco voltariam a ser texto no concat)
+    return {coluna: 'texto' if tipo in ('categoria', 'rotulo') else tipo for coluna, tipo in esquema.items()}
+
+@rastreado(categoria='pandas')
+def aplicar_esquema(df, esquema=ESQUEMA_BASE_LOOKER, relatar=True, nome='Base'):
+    # Descarta as colunas fora do esquema, converte as demais e informa a memória antes e depois
+    ausentes = [coluna for coluna in esquema if coluna not in df.columns]
+    if ausentes:
+        raise ValueError(f"Colunas ausentes na planilha: {', '.join(ausentes)}")
+
+    colunas_antes, memoria_antes = df.shape[1], memoria_mb(df) if relatar else None
+
+    df = df.drop(columns=[coluna for coluna in df.columns if coluna not in esquema])
+    for coluna, tipo in esquema.items():
+        df[coluna] = CONVERSORES[tipo](df[coluna])
+
+    if relatar:
+        print(f"{nome}: {colunas_antes} colunas, {memoria_antes:.1f} MB -> {df.shape[1]} colunas, {memoria_mb(df):.1f} MB.")
+    return df
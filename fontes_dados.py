@@ -0,0 +1,75 @@
+import os
+import hashlib
+import pandas as pd
+from get_data_pw import get_data_pw, preparar_dados_pw
+from sintetico import gerar_base_looker
+
+#### FONTES DOS DADOS ####
+class FonteDados:
+    # Origem da aba base_looker: ler() devolve o DataFrame já tipado e origem() a identifica.
+    # Fontes remotas ganham um snapshot local (ver get_data_pw_snapshot)
+    remota = False
+
+    def ler(self):
+        raise NotImplementedError
+
+    def origem(self):
+        raise NotImplementedError
+
+class FontePlanilha(FonteDados):
+    # Google Sheets, com as credenciais e o proxy do .env
+    remota = True
+
+    def __init__(self, proxy, cred_google, url_sheet):
+        self.proxy = proxy
+        self.cred_google = cred_google
+        self.url_sheet = url_sheet
+
+    def ler(self):
+        return get_data_pw(self.proxy, self.cred_google, self.url_sheet)
+
+    def origem(self):
+        # Identifica a planilha de origem sem gravar a chave em disco
+        return hashlib.sha256(str(self.url_sheet).encode('utf-8')).hexdigest()[:16]
+
+class FonteArquivo(FonteDados):
+    # Exportação local da aba: CSV, Parquet ou XLSX (este último requer openpyxl)
+    def __init__(self, caminho):
+        self.caminho = caminho
+
+    def ler(self):
+        extensao = os.path.splitext(self.caminho)[1].lower()
+        if extensao == '.csv':
+            # Tudo como texto e células vazias como '', como vêm da planilha
+            df = pd.read_csv(self.caminho, dtype=str, keep_default_na=False)
+        elif extensao == '.parquet':
+            df = pd.read_parquet(self.caminho)
+        elif extensao in ['.xlsx', '.xlsm']:
+            df = pd.read_excel(self.caminho, dtype=object)
+        else:
+            raise ValueError(f"Formato de arquivo não suportado: '{self.caminho}' (use .csv, .parquet ou .xlsx)")
+        return preparar_dados_pw(df)
+
+    def origem(self):
+        return os.path.abspath(self.caminho)
+
+class FonteSintetica(FonteDados):
+    # Dados fictícios gerados na hora (ver sintetico.py)
+    def __init__(self, linhas, semente=0):
+        self.linhas = linhas
+        self.semente = semente
+
+    def ler(self):
+        return preparar_dados_pw(gerar_base_looker(self.linhas, self.semente))
+
+    def origem(self):
+        return f'sintetico:{self.linhas}:{self.semente}'
+
+def fonte_local(especificacao):
+    # 'sintetico[:linhas[:semente]]' ou o caminho de um arquivo exportado
+    if especificacao.startswith('sintetico'):
+        partes = especificacao.split(':')
+        linhas = int(partes[1]) if len(partes) > 1 else 1000
+        semente = int(partes[2]) if len(partes) > 2 else 0
+        return FonteSintetica(linhas, semente)
+    return FonteArquivo(especificacao)
@@ -2,8 +2,48 @@ import pandas as pd
 import gspread
 from oauth2client.service_account import ServiceAccountCredentials
 import os
+import json
+import time
+import random
+import hashlib
+import requests
+from requests.adapters import HTTPAdapter
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+from esquema import aplicar_esquema, sem_categorias, ESQUEMA_BASE_LOOKER
+from rastreio import trecho, rastreado
 
-def get_data_pw(proxy, cred_google, url_sheet):
+# Leitura da aba em blocos de linhas (A2:BE5001, A5002:BE10001, ...)
+LINHAS_POR_BLOCO = 5000
+ULTIMA_COLUNA = 'BE'
+
+# Abas lidas por padrão e o esquema de cada uma (None = colunas mantidas como texto)
+ABAS_PW = {'base_looker': ESQUEMA_BASE_LOOKER}
+
+# Requisições simultâneas à API e novas tentativas em caso de limite de uso ou falha temporária
+MAX_CONEXOES = 4
+TENTATIVAS = 5
+ESPERA_INICIAL = 1.0
+STATUS_TEMPORARIOS = {429, 500, 502, 503, 504}
+
+def get_data_pw(proxy, cred_google, url_sheet, linhas_por_bloco=LINHAS_POR_BLOCO):
+    # Aba base_looker, já tipada
+    return get_abas_pw(proxy, cred_google, url_sheet, ABAS_PW, linhas_por_bloco=linhas_por_bloco)['base_looker']
+
+def get_abas_pw(proxy, cred_google, url_sheet, abas=ABAS_PW, max_conexoes=MAX_CONEXOES, linhas_por_bloco=LINHAS_POR_BLOCO):
+    # Lê várias abas ao mesmo tempo: {nome da aba: esquema} -> {nome da aba: DataFrame}.
+    # Cada aba tem sua thread de leitura; os blocos de todas são baixados por um conjunto
+    # comum de max_conexoes threads, que compartilham as conexões da sessão
+    with trecho('conectar', 'rede'):
+        spreadsheet = conectar(proxy, cred_google, url_sheet, max_conexoes)
+
+    with ThreadPoolExecutor(max_workers=max_conexoes) as rede, ThreadPoolExecutor(max_workers=max(len(abas), 1)) as leitores:
+        futuros = {nome: leitores.submit(ler_aba, spreadsheet, nome, esquema, rede, linhas_por_bloco)
+                   for nome, esquema in abas.items()}
+        return {nome: futuro.result() for nome, futuro in futuros.items()}
+
+#### CONEXÃO COM A PLANILHA ####
+def conectar(proxy, cred_google, url_sheet, max_conexoes=MAX_CONEXOES):
 
     # Configurações de proxy
     usuario = proxy[0]    
@@ -20,23 +60,174 @@ def get_data_pw(proxy, cred_google, url_sheet):
     creds = ServiceAccountCredentials.from_json_keyfile_name(cred_google, scope)
     client = gspread.authorize(creds)
 
+    # Uma conexão reaproveitável por requisição simultânea
+    adaptador = HTTPAdapter(pool_connections=max_conexoes, pool_maxsize=max_conexoes)
+    client.http_client.session.mount('https://', adaptador)
+
     # Abrir a planilha pelo nome
     # DADO SENSÍVEL
-    spreadsheet = client.open_by_key(url_sheet)
+    return com_retentativas(client.open_by_key, url_sheet)
 
-    # Selecionar a folha de trabalho
-    worksheet = spreadsheet.worksheet("base_looker")  # ou use worksheet = spreadsheet.get_worksheet(0) para a primeira folha
+def com_retentativas(funcao, *args, tentativas=TENTATIVAS, espera_inicial=ESPERA_INICIAL):
+    # Repete a chamada à API quando ela informa limite de uso (429) ou falha temporária (5xx)
+    # ou quando a conexão cai; outros erros são repassados na hora
+    for tentativa in range(tentativas):
+        try:
+            return funcao(*args)
+        except (gspread.exceptions.APIError, requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+            resposta = getattr(e, 'response', None)
+            status = getattr(resposta, 'status_code', None)
+            temporario = status in STATUS_TEMPORARIOS or not isinstance(e, gspread.exceptions.APIError)
+            if not temporario or tentativa == tentativas - 1:
+                raise
 
-    # Puxar os dados do intervalo específico
-    data = worksheet.get('A1:BE')
+            # Respeitar o Retry-After da API; sem ele, espera exponencial com variação aleatória
+            retry_after = resposta.headers.get('Retry-After') if resposta is not None else None
+            if retry_after and retry_after.isdigit():
+                espera = float(retry_after)
+            else:
+                espera = espera_inicial * 2 ** tentativa * (1 + random.random())
+            print(f"Planilha indisponível ({status or type(e).__name__}); nova tentativa em {espera:.1f}s.")
+            time.sleep(espera)
 
-    # Converter para DataFrame do pandas
-    lista_pw = pd.DataFrame(data[1:], columns=data[0])  # Primeira linha como cabeçalho
+#### LEITURA EM BLOCOS ####
+def ler_aba(spreadsheet, nome, esquema, rede=None, linhas_por_bloco=LINHAS_POR_BLOCO):
+    with trecho(f'ler_aba {nome}', 'rede') as t:
+        worksheet = com_retentativas(spreadsheet.worksheet, nome)
+        df = ler_em_blocos(worksheet, linhas_por_bloco, esquema, rede, nome)
+        t.registrar(linhas=len(df))
+    return df
+
+def bloco_para_df(linhas, cabecalho, primeira_linha):
+    # A API omite as células vazias do fim de cada linha: completar até a largura do cabeçalho
+    largura = len(cabecalho)
+    linhas = [linha[:largura] + [None] * (largura - len(linha)) for linha in linhas]
+
+    # Índice pela posição na planilha (como na leitura da aba inteira de uma vez)
+    bloco = pd.DataFrame(linhas, columns=cabecalho, index=range(primeira_linha - 2, primeira_linha - 2 + len(linhas)))
 
     # Remover linhas onde todos os valores são NaN
-    lista_pw = lista_pw.dropna(subset=['ID-PW'])
+    return bloco.dropna(subset=['ID-PW']) if 'ID-PW' in bloco.columns else bloco
+
+def ler_em_blocos(worksheet, linhas_por_bloco=LINHAS_POR_BLOCO, esquema=ESQUEMA_BASE_LOOKER, rede=None, nome='Base'):
+    # Baixa a aba em blocos de linhas (batch_get) e converte cada bloco assim que ele chega,
+    # enquanto o próximo é baixado; só o bloco em conversão fica em memória como texto.
+    # Sem rede (conjunto de threads de download), usa uma thread própria
+    cabecalho = com_retentativas(worksheet.get, f'A1:{ULTIMA_COLUNA}1')[0]
+    inicios = list(range(2, worksheet.row_count + 1, linhas_por_bloco))
+
+    def buscar(inicio):
+        with trecho('baixar_bloco', 'rede', aba=nome, primeira_linha=inicio) as t:
+            linhas = com_retentativas(worksheet.batch_get, [f'A{inicio}:{ULTIMA_COLUNA}{inicio + linhas_por_bloco - 1}'])[0]
+            t.registrar(linhas=len(linhas))
+        return linhas
+
+    def tipar(bloco):
+        return aplicar_esquema(bloco, esquema_bloco, relatar=False) if esquema else bloco
+
+    # As categorias são criadas uma vez, depois de juntar os blocos
+    esquema_bloco = sem_categorias(esquema) if esquema else None
+    blocos = []
+    propria = rede is None
+    if propria:
+        rede = ThreadPoolExecutor(max_workers=1)
+    try:
+        pendente = rede.submit(buscar, inicios[0]) if inicios else None
+        for i, inicio in enumerate(inicios):
+            linhas = pendente.result()
+            if i + 1 < len(inicios):
+                pendente = rede.submit(buscar, inicios[i + 1])
+            if linhas:
+                blocos.append(tipar(bloco_para_df(linhas, cabecalho, inicio)))
+    finally:
+        if propria:
+            rede.shutdown()
+
+    if not blocos:
+        blocos.append(tipar(bloco_para_df([], cabecalho, 2)))
+    df = pd.concat(blocos)
+    return aplicar_esquema(df, esquema, nome=nome) if esquema else df
+
+#### TIPAGEM DOS DADOS ####
+def preparar_dados_pw(df):
+    # Tipos de cada coluna e descarte das colunas não usadas (ver esquema.py)
+    return aplicar_esquema(df)
+
+#### SNAPSHOT LOCAL DOS DADOS ####
+def hash_dados(df):
+    # Hash do conteúdo do DataFrame (valores e nomes de colunas)
+    hash_linhas = pd.util.hash_pandas_object(df, index=False).values
+    h = hashlib.sha256(hash_linhas.tobytes())
+    h.update('|'.join(df.columns).encode('utf-8'))
+    return h.hexdigest()
+
+@rastreado(categoria='cache')
+def ler_snapshot(caminho_cache):
+    # Retorna o DataFrame e os metadados do snapshot, ou (None, None) se não houver
+    caminho_meta = os.path.splitext(caminho_cache)[0] + '.json'
+    if not (os.path.exists(caminho_cache) and os.path.exists(caminho_meta)):
+        return None, None
+
+    with open(caminho_meta, 'r', encoding='utf-8') as f:
+        meta = json.load(f)
+
+    df = pd.read_parquet(caminho_cache)
+
+    # Descartar o snapshot se o conteúdo não corresponder ao hash registrado
+    if hash_dados(df) != meta.get('hash'):
+        print(f"Snapshot '{caminho_cache}' corrompido, ignorando.")
+        return None, None
+
+    return df, meta
+
+@rastreado(categoria='cache')
+def gravar_snapshot(df, caminho_cache, origem):
+    caminho_meta = os.path.splitext(caminho_cache)[0] + '.json'
+    os.makedirs(os.path.dirname(caminho_cache) or '.', exist_ok=True)
+
+    meta = {
+        'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        'origem': origem,
+        'linhas': len(df),
+        'hash': hash_dados(df),
+    }
+
+    # Gravar em arquivo temporário e renomear, para não deixar snapshot pela metade
+    df.to_parquet(caminho_cache + '.tmp', index=False)
+    os.replace(caminho_cache + '.tmp', caminho_cache)
+    with open(caminho_meta, 'w', encoding='utf-8') as f:
+        json.dump(meta, f, indent=2)
+
+    return meta
+
+def get_data_pw_snapshot(fonte, caminho_cache='cache/base_looker.parquet', ttl_horas=12, forcar=False):
+    # Fonte remota (ver fontes_dados.py) com snapshot local
+    origem = fonte.origem()
+
+    df_cache, meta = ler_snapshot(caminho_cache)
+    if df_cache is not None and meta.get('origem') != origem:
+        df_cache, meta = None, None
 
-    return lista_pw
+    # Usar o snapshot local enquanto estiver dentro da validade
+    if df_cache is not None and not forcar:
+        idade = datetime.now() - datetime.fromisoformat(meta['gerado_em'])
+        if idade < timedelta(hours=ttl_horas):
+            print(f"Usando snapshot local de {meta['gerado_em']} ({meta['linhas']} linhas).")
+            return preparar_dados_pw(df_cache)
 
+    # Buscar os dados na planilha
+    try:
+        df = fonte.ler()
+    except Exception as e:
+        # Sem acesso à planilha, usar o último snapshot disponível
+        if df_cache is None:
+            raise
+        print(f"Erro ao buscar a planilha ({e}); usando snapshot de {meta['gerado_em']}.")
+        return preparar_dados_pw(df_cache)
 
+    try:
+        gravar_snapshot(df, caminho_cache, origem)
+    except Exception as e:
+        print(f"Não foi possível gravar o snapshot local: {e}")
 
+    return df
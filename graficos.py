@@ -0,0 +1,75 @@
+import matplotlib
+from contextlib import contextmanager
+from matplotlib.figure import Figure
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from rastreio import trecho
+
+# Configurações comuns a todos os gráficos, aplicadas só enquanto a figura existe
+ESTILO = {
+    'font.family': 'Arial',
+}
+
+#### CICLO DE VIDA DAS FIGURAS ####
+@contextmanager
+def figura(figsize=(10, 6)):
+    # Figura criada direto no canvas Agg, sem passar pelo pyplot: não fica registrada
+    # no gerenciador de figuras e é liberada ao sair do bloco, mesmo em caso de erro
+    with matplotlib.rc_context(ESTILO):
+        fig = Figure(figsize=figsize)
+        FigureCanvasAgg(fig)
+        try:
+            yield fig
+        finally:
+            # Liberar os artistas; sem o pyplot, nada mais guarda a figura depois do bloco
+            fig.clear()
+
+@contextmanager
+def grafico_barras(figsize=(10, 6), eixo_y=False):
+    # Figura com um único eixo já no estilo padrão dos gráficos de barras
+    with figura(figsize) as fig:
+        ax = fig.add_subplot()
+        estilizar_eixos(ax, eixo_y)
+        yield fig, ax
+
+#### ESTILO DOS EIXOS ####
+def estilizar_eixos(ax, eixo_y=False):
+    # Remover os eixos e bordas
+    for lado in ['top', 'right', 'left', 'bottom']:
+        ax.spines[lado].set_visible(False)
+
+    # Remover as linhas que unem os rótulos do eixo x às barras
+    ax.xaxis.tick_bottom()
+    ax.tick_params(axis='x', length=0)
+
+    # Nos gráficos com escala, os valores do eixo y ficam à esquerda, sem traços
+    if eixo_y:
+        ax.yaxis.tick_left()
+        ax.tick_params(axis='y', length=0)
+
+def rotulos_x(ax, fontsize):
+    # Rótulos do eixo x na horizontal e em negrito
+    for rotulo in ax.get_xticklabels():
+        rotulo.set(rotation=0, fontsize=fontsize, fontweight='bold')
+
+def escala_y(ax, ticks, fontsize):
+    # Valores do eixo y (sem ticks, os rótulos são removidos)
+    ax.set_yticks(ticks)
+    for rotulo in ax.get_yticklabels():
+        rotulo.set(fontsize=fontsize)
+
+def anotar_barras(ax, bars, fontsize, formatar=lambda altura: f'{altura}'):
+    # Adicionar rótulos de valores acima das barras
+    for bar in bars:
+        ax.annotate(formatar(bar.get_height()),
+                    (bar.get_x() + bar.get_width() / 2, bar.get_height()),
+                    ha='center', va='bottom', fontsize=fontsize, fontweight='bold')
+
+def linha_base(ax):
+    # Adicionar uma linha fina preta como eixo x
+    ax.axhline(y=0, color='black', linewidth=2)
+
+def salvar_figura(fig, img_output):
+    # Salvar o gráfico como imagem
+    with trecho('savefig', 'matplotlib', arquivo=img_output):
+        fig.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
+    return img_output
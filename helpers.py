@@ -1,127 +1,37 @@
 import pandas as pd
 import urllib.parse
 import numpy as np
-import imgkit
 import os 
+import io
+import re
 import html
-import matplotlib.pyplot as plt
 from datetime import datetime, timedelta
 from PIL import Image
-
-def define_planinfra(row):
-    if '2024/2025' in row['INSCRIÇÃO']:
-        return 'PLANINFRA 2024/2025'
-    elif '2023/2024' in row['INSCRIÇÃO']:
-        return 'PLANINFRA 2023/2024'
-    elif '2025/2026' in row['INSCRIÇÃO']:
-        return 'PLANINFRA 2025/2026'
-    else:
-        return 'Anterior a 2023'
-
-def define_prazo_vigente(row):
-    if pd.isna(row['PRAZO PROJETO VIGENTE']) and not pd.isna(row['TÉRMINO_PTA']):
-        return row['TÉRMINO_PTA']
-    elif pd.isna(row['TÉRMINO_PTA']):
-        # return today date
-        return datetime.today().date()
-    else:
-        return row['PRAZO PROJETO VIGENTE']
-    
-def cod_proj(row):
-    if row['STATUS'] in ['PCN', 'PSP', 'PII']:
-        return 9
-    elif row['STATUS'] in ['PRC', 'LIA', 'OBI', 'OBC', 'OSP', 'OCN']:
-        if pd.isna(row['PRAZO PROJETO VIGENTE + PTA']):
-            return 8
-        else:
-            return 7
-    elif row['STATUS'] == 'PRI':
-        if row['Data de entrega do Projeto'] + timedelta(days=30) < (datetime.today() - timedelta(days=1)):
-            return 4
-        elif row['PRAZO PROJETO VIGENTE + PTA'] < (datetime.today().date() -timedelta(days=1)) and pd.isna(row['Data de entrega do Projeto']):
-            return 1
-        elif row['PRAZO PROJETO VIGENTE + PTA'] < datetime.today().date() + timedelta(days=29):
-            return 3
-        else:
-            return 5
-    elif row['STATUS'] == 'AGD':
-        if row['INÍCIO_PTA'] < datetime.today():
-            return 2
-        else:
-            return 6
-    else:
-        return 9
-            
-def definir_status_prazo(cod_prazo_prj):
-    if cod_prazo_prj == 0:
-        return "Prazo Ausente"
-    elif cod_prazo_prj == 1:
-        return "Prazo Expirado"
-    elif cod_prazo_prj == 2:
-        return "Projeto não iniciado (pelo PTA deveria)"
-    elif cod_prazo_prj == 3:
-        return "Prazo do projeto encerrando (30d)"
-    elif cod_prazo_prj == 4:
-        return "TEP não assinado (+30d)"
-    elif cod_prazo_prj == 5:
-        return "Projeto em andamento"
-    elif cod_prazo_prj == 6:
-        return "Aguardando início de projeto"
-    elif cod_prazo_prj == 7 or cod_prazo_prj == 8:
-        return "Projeto concluído"
-    else:
-        return "Projeto cancelado ou suspenso"
-
-def prazo_projeto(cod_prazo_prj, prazo_vigente):    
-    if cod_prazo_prj == 0:
-        return "💥"
-    elif cod_prazo_prj == 1:
-        return f"💥 {prazo_vigente}"
-    elif cod_prazo_prj == 2:
-        return f"🔴 {prazo_vigente}"
-    elif cod_prazo_prj == 3:
-        return f"⚠️ {prazo_vigente}"
-    elif cod_prazo_prj == 4:
-        return f"🟡 {prazo_vigente}"
-    elif cod_prazo_prj == 5:
-        return f"📈 {prazo_vigente}"
-    elif cod_prazo_prj == 6:
-        return f"⏳ {prazo_vigente}"
-    elif cod_prazo_prj == 7:
-        return f"✅ {prazo_vigente}"
-    elif cod_prazo_prj == 8:
-        return "✅"
-    else:
-        return "⛔"
+from renderizador import html_para_png, gravar_png, renderizar_html, renderizar_lote
+from cubo import contar, contar_por, somar, ordem_status, agrupar_outros, resumo_por_status
+from moeda import formatar_brl
+from tabela_html import celulas, celulas_indicador, celulas_progresso, montar_tabela
+from graficos import figura, grafico_barras, rotulos_x, escala_y, anotar_barras, linha_base, salvar_figura
 
 #### TABELAS DE RESUMO ####
-def criar_resumo(df, year, filename, title):
-    # Contar quantas vezes cada status aparece
-    status_count = df.groupby('STATUS_Ext').size().reset_index(name='Quantidade')
-
-    # Somar os valores da coluna VALOR agrupados por Status_ext
-    status_sum = df.groupby('STATUS_Ext')['VALOR'].sum().reset_index(name='Total Valor (R$)')
-    custo_total = round(status_sum['Total Valor (R$)'].sum()/1000000,2)
-    status_sum['Total Valor (R$)'] = status_sum['Total Valor (R$)'].round(2)
-
-    # Juntar as duas informações em um único DataFrame
-    summary_df = pd.merge(status_count, status_sum, on='STATUS_Ext')
-
-    # Adicionar a coluna 'Ordem_Status' ao summary_df
-    summary_df = pd.merge(summary_df, df[['STATUS_Ext', 'Ordem_Status']], on='STATUS_Ext', how='left')
-
-    # Remover duplicatas da coluna 'Ordem_Status'
-    summary_df = summary_df.drop_duplicates(subset='STATUS_Ext')
+def tabela_resumo(cubo):
+    # Quantidade, soma dos valores e Ordem_Status por Status_ext, lidos do cubo
+    summary_df = resumo_por_status(cubo).rename(columns={'VALOR': 'Total Valor (R$)'})
+    custo_total = round(summary_df['Total Valor (R$)'].sum()/1000000,2)
+    summary_df['Total Valor (R$)'] = summary_df['Total Valor (R$)'].round(2)
 
     # Formatar a coluna 'Total Valor (R$)' no formato brasileiro
-    summary_df['Total Valor (R$)'] = summary_df['Total Valor (R$)'].apply(
-        lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    )
+    summary_df['Total Valor (R$)'] = formatar_brl(summary_df['Total Valor (R$)'])
 
     # Ordenar o DataFrame pelo campo 'Ordem_Status'
     summary_df = summary_df.sort_values(by='Ordem_Status')
     summary_df = summary_df.drop(columns=['Ordem_Status'])
 
+    return summary_df, custo_total
+
+def criar_resumo(cubo, year, filename, title):
+    summary_df, custo_total = tabela_resumo(cubo)
+
     # Geração do HTML com estilos
 
     # Definindo estilo CSS para bordas, alinhamento e cores
@@ -211,26 +121,9 @@ def criar_resumo(df, year, filename, title):
     # Combinando o estilo e a tabela HTML
     html_output = f"{style}\n{header}\n{html_table}\n{footer_text}"
 
-    # Salvando a tabela como arquivo HTML
-    html_path = 'tabela_resumo.html'
-    with open('tabela_resumo.html', 'w', encoding='utf-8') as f:
-        f.write(html_output)
-
-    # Configurações para gerar a imagem
-    img_options = {
-        'format': 'png',
-        'encoding': 'UTF-8',
-        'width': 500 
-    }
-
     # Converter o HTML em imagem (PNG)
     img_output = f'outputs/{year}/resumos/{filename}.png'
-    imgkit.from_file(html_path, img_output, options=img_options)
-
-    # Excluir o arquivo HTML após gerar a imagem
-    if os.path.exists(html_path):
-        os.remove(html_path)
-        print(f"Arquivo HTML '{html_path}' excluído com sucesso.")
+    renderizar_html(html_output, img_output, largura=500)
 
     return img_output
 
@@ -240,33 +133,7 @@ def adicionar_estilo(row, destaque):
     # Criar a linha da tabela HTML com a classe correspondente
     return f'<tr class="{estilo}">' + ''.join([f'<td>{cell}</td>' for cell in row]) + '</tr>'
 
-def criar_resumo_destaque(df, year, filename, title,destaque):
-    # Contar quantas vezes cada status aparece
-    status_count = df.groupby('STATUS_Ext').size().reset_index(name='Quantidade')
-
-    # Somar os valores da coluna VALOR agrupados por Status_ext
-    status_sum = df.groupby('STATUS_Ext')['VALOR'].sum().reset_index(name='Total Valor (R$)')
-    custo_total = round(status_sum['Total Valor (R$)'].sum()/1000000,2)
-    status_sum['Total Valor (R$)'] = status_sum['Total Valor (R$)'].round(2)
-
-    # Juntar as duas informações em um único DataFrame
-    summary_df = pd.merge(status_count, status_sum, on='STATUS_Ext')
-
-    # Adicionar a coluna 'Ordem_Status' ao summary_df
-    summary_df = pd.merge(summary_df, df[['STATUS_Ext', 'Ordem_Status']], on='STATUS_Ext', how='left')
-
-    # Remover duplicatas da coluna 'Ordem_Status'
-    summary_df = summary_df.drop_duplicates(subset='STATUS_Ext')
-
-    # Formatar a coluna 'Total Valor (R$)' no formato brasileiro
-    summary_df['Total Valor (R$)'] = summary_df['Total Valor (R$)'].apply(
-        lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    )
-
-    # Ordenar o DataFrame pelo campo 'Ordem_Status'
-    summary_df = summary_df.sort_values(by='Ordem_Status')
-    summary_df = summary_df.drop(columns=['Ordem_Status'])
-
+def html_resumo_destaque(summary_df, custo_total, title, destaque):
     # Geração do HTML com estilos
 
     # Definindo estilo CSS para bordas, alinhamento e cores
@@ -370,159 +237,102 @@ def criar_resumo_destaque(df, year, filename, title,destaque):
     """
 
     # Combinando o estilo e a tabela HTML
-    html_output = f"{style}\n{header}\n{html_table}\n{footer_text}"
+    return f"{style}\n{header}\n{html_table}\n{footer_text}"
 
-    # Salvando a tabela como arquivo HTML
-    html_path = 'tabela_resumo.html'
-    with open('tabela_resumo.html', 'w', encoding='utf-8') as f:
-        f.write(html_output)
+def criar_resumos_destaque(cubo, year, destaques, title):
+    # destaques: lista de tuplas (nome do arquivo, grupo de STATUS_Ext em destaque)
+    # O resumo do ano é calculado uma só vez; cada variante só muda as linhas em negrito
+    summary_df, custo_total = tabela_resumo(cubo)
 
-    # Configurações para gerar a imagem
-    img_options = {
-        'format': 'png',
-        'encoding': 'UTF-8',
-        'width': 500 
-    }
+    documentos = []
+    for filename, destaque in destaques:
+        img_output = f'outputs/{year}/resumos/{filename}.png'
+        documentos.append((html_resumo_destaque(summary_df, custo_total, title, destaque), img_output, 500))
 
-    # Converter o HTML em imagem (PNG)
-    img_output = f'outputs/{year}/resumos/{filename}.png'
-    imgkit.from_file(html_path, img_output, options=img_options)
+    # Converter todas as variantes em imagem (PNG) de uma vez no renderizador
+    return renderizar_lote(documentos)
 
-    # Excluir o arquivo HTML após gerar a imagem
-    if os.path.exists(html_path):
-        os.remove(html_path)
-        print(f"Arquivo HTML '{html_path}' excluído com sucesso.")
-
-    return img_output
+def criar_resumo_destaque(cubo, year, filename, title,destaque):
+    return criar_resumos_destaque(cubo, year, [(filename, destaque)], title)[0]
 
 #### GRÁFICO DE BARRAS DE STATUS ####
-def criar_barra_status(df, year, filename, title):
-    # Agrupar os dados pela coluna 'STATUS' e contar as ocorrências
-    status_counts = df['STATUS'].value_counts()
+def criar_barra_status(cubo, year, filename, title):
+    # Contar as ocorrências de cada 'STATUS'
+    status_counts = contar(cubo, 'STATUS')
 
     #Ordenar o status_counts de acordo com a coluna 'ORdem_status'
-    df_sorted = df.drop_duplicates('STATUS').set_index('STATUS').loc[status_counts.index]
-    status_counts = status_counts.loc[df_sorted.sort_values('Ordem_Status').index]
-
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
+    ordem = ordem_status(cubo, 'STATUS').loc[status_counts.index]
+    status_counts = status_counts.loc[ordem.sort_values().index]
 
     # Definir cores para as barras
     colors = ['gray' if status not in ['PRC', 'OBI', 'OBC', 'LIA', 'OSP', 'OCN'] else '#224b89' for status in status_counts.index]
 
-    # Adicionar as barras sem criar uma legenda automática
-    bars = plt.bar(status_counts.index, status_counts.values, color=colors)
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
-
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
+    img_output = f'outputs/{year}/status/{filename}.png'
 
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=16, fontweight='bold')
+    # Criar o gráfico de barras
+    with grafico_barras() as (fig, ax):
+        # Adicionar as barras sem criar uma legenda automática
+        bars = ax.bar(status_counts.index, status_counts.values, color=colors)
 
-    # Remover rótulos do eixo y
-    plt.yticks([])
+        # Definir os rótulos do eixo x na horizontal e remover rótulos do eixo y
+        rotulos_x(ax, fontsize=16)
+        ax.set_yticks([])
 
-    # Adicionar rótulos de valores acima das barras
-    for bar in bars:
-        plt.annotate(f'{bar.get_height()}', 
-                    (bar.get_x() + bar.get_width() / 2, bar.get_height()), 
-                    ha='center', va='bottom', fontsize=16, fontweight='bold')
+        anotar_barras(ax, bars, fontsize=16)
+        linha_base(ax)
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        # Adicionar a legenda personalizada
+        ax.scatter([], [], color='#224b89', label='Projetos entregues')
+        ax.legend(loc='upper center', fontsize=16, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 1)
 
-    # Adicionar a legenda personalizada
-    plt.scatter([], [], color='#224b89', label='Projetos entregues')
-    plt.legend(loc='upper center', fontsize=16, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 1)
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    plt.title(title, fontsize=18, fontweight='bold')
+        # Ajustar o layout para deixar espaço para a legenda abaixo
+        fig.tight_layout()
+        fig.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
 
-     # Ajustar o layout para deixar espaço para a legenda abaixo
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
+        salvar_figura(fig, img_output)
 
-    img_output = f'outputs/{year}/status/{filename}.png'
-
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
-    
-    #plt.show()
     return img_output
 
 #### GRÁFICO DE BARRAS DE STATUS DE PROJETO PRI OU AGD ####
-def criar_barra_status_prj(df, year, filename, title):
-    # Agrupar os dados pela coluna 'STATUS_PRAZO_PRJ' e contar as ocorrências
-    status_counts = df['STATUS_PRAZO_PRJ'].value_counts()
-
-    # Criar o gráfico de barras
-    # Configurar a fonte para Arial
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
+def criar_barra_status_prj(cubo, year, filename, title):
+    # Contar as ocorrências de cada 'STATUS_PRAZO_PRJ'
+    status_counts = contar(cubo, 'STATUS_PRAZO_PRJ')
 
     # Definir cores para as barras
     colors = '#224b89'
 
-    # Adicionar as barras sem criar uma legenda automática
-    bars = plt.bar(status_counts.index, status_counts.values, color=colors)
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
-
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
+    img_output = f'outputs/{year}/status_det/{filename}.png'
 
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=10, fontweight='bold')
+    # Criar o gráfico de barras
+    with grafico_barras() as (fig, ax):
+        # Adicionar as barras sem criar uma legenda automática
+        bars = ax.bar(status_counts.index, status_counts.values, color=colors)
 
-    # Remover rótulos do eixo y
-    plt.yticks([])
+        # Definir os rótulos do eixo x na horizontal e remover rótulos do eixo y
+        rotulos_x(ax, fontsize=10)
+        ax.set_yticks([])
 
-    # Adicionar rótulos de valores acima das barras
-    for bar in bars:
-        plt.annotate(f'{bar.get_height()}', 
-                    (bar.get_x() + bar.get_width() / 2, bar.get_height()), 
-                    ha='center', va='bottom', fontsize=16, fontweight='bold')
+        anotar_barras(ax, bars, fontsize=16)
+        linha_base(ax)
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    plt.title(title, fontsize=18, fontweight='bold')
-    
-    plt.tight_layout()
-    img_output = f'outputs/{year}/status_det/{filename}.png'
+        fig.tight_layout()
+        salvar_figura(fig, img_output)
 
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
-    
-    #plt.show()
     return img_output
 
 #### GRÁFICO DE BARRAS DE PROJETOS ENTREGUES POR ELOS ####
-def criar_barra_resp_prc(df, year, filename, title):
+def criar_barra_resp_prc(cubo, year, filename, title):
 
     # Substituir os valores que não estão na lista por 'OUTROS'
     lista_inclusao = ['CEPE','SR-BE', 'SR-BR','SR-CO','SR-MN','SR-NT','SR-RJ','SR-SJ','GAC-AN','COMARA','GECAMP']
-    df['RESP_PRJ_Abr'] = df['RESP_PRJ_Abr'].where(df['RESP_PRJ_Abr'].isin(lista_inclusao), 'OUTROS')
+    cubo = agrupar_outros(cubo, 'RESP_PRJ_Abr', lista_inclusao)
     
-    # Agrupar os dados pela coluna 'STATUS' e contar as ocorrências
-    counts = df['RESP_PRJ_Abr'].value_counts()
+    # Contar as ocorrências de cada 'RESP_PRJ_Abr'
+    counts = contar(cubo, 'RESP_PRJ_Abr')
         
     # Reordenar o DataFrame agrupado com base no total de observações, em ordem decrescente
     counts = counts.loc[counts.sort_values(ascending=False).index]
@@ -533,65 +343,42 @@ def criar_barra_resp_prc(df, year, filename, title):
         counts = counts.drop('OUTROS')
         counts = pd.concat([counts, outros])
 
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
-
     # Definir cores para as barras
     #colors = ['gray' if status not in ['PRC', 'OBI', 'OBC', 'LIA', 'OSP', 'OCN'] else '#224b89' for status in status_counts.index]
     colors = '#224b89'
 
-    # Adicionar as barras sem criar uma legenda automática
-    bars = plt.bar(counts.index, counts.values, color=colors)
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
-
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
-
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=12, fontweight='bold')
-
-    # Remover rótulos do eixo y
-    plt.yticks([])
+    img_output = f'outputs/{year}/entregues/{filename}.png'
 
-    # Adicionar rótulos de valores acima das barras
-    for bar in bars:
-        plt.annotate(f'{bar.get_height()}', 
-                    (bar.get_x() + bar.get_width() / 2, bar.get_height()), 
-                    ha='center', va='bottom', fontsize=12, fontweight='bold')
+    # Criar o gráfico de barras
+    with grafico_barras() as (fig, ax):
+        # Adicionar as barras sem criar uma legenda automática
+        bars = ax.bar(counts.index, counts.values, color=colors)
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        # Definir os rótulos do eixo x na horizontal e remover rótulos do eixo y
+        rotulos_x(ax, fontsize=12)
+        ax.set_yticks([])
 
-    plt.title(title, fontsize=18, fontweight='bold')
+        anotar_barras(ax, bars, fontsize=12)
+        linha_base(ax)
 
-    plt.tight_layout()
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    img_output = f'outputs/{year}/entregues/{filename}.png'
+        fig.tight_layout()
+        salvar_figura(fig, img_output)
 
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
-    
-    #plt.show()
     return img_output
 
 #### GRÁFICO DE BARRAS DE PROJETOS ENTREGUES POR ELOS DESTACANDO POR GRUPOS ####
-def criar_barra_resp_prc_destaq(df, year, filename_base, title_base):
+def criar_barra_resp_prc_destaq(cubo, df, year, filename_base, title_base, data_referencia=None):
+    # Os números vêm do cubo; o df (mesmo recorte) só é usado nas listas de projetos
 
     # Substituir os valores que não estão na lista por 'OUTROS'
     lista_inclusao = ['CEPE','SR-BE', 'SR-BR','SR-CO','SR-MN','SR-NT','SR-RJ','SR-SJ','GAC-AN','COMARA','GECAMP']
-    df['RESP_PRJ_Abr'] = df['RESP_PRJ_Abr'].where(df['RESP_PRJ_Abr'].isin(lista_inclusao), 'OUTROS')
+    cubo = agrupar_outros(cubo, 'RESP_PRJ_Abr', lista_inclusao)
+    df = agrupar_outros(df, 'RESP_PRJ_Abr', lista_inclusao)
 
-    # Agrupar os dados pela coluna 'RESP_PRJ_Abr' e contar as ocorrências
-    counts = df['RESP_PRJ_Abr'].value_counts()
+    # Contar as ocorrências de cada 'RESP_PRJ_Abr'
+    counts = contar(cubo, 'RESP_PRJ_Abr')
 
     # Reordenar o DataFrame agrupado com base no total de observações, em ordem decrescente
     counts = counts.loc[counts.sort_values(ascending=False).index]
@@ -635,12 +422,6 @@ def criar_barra_resp_prc_destaq(df, year, filename_base, title_base):
         # Extrair rótulos e valores para o gráfico atual
         labels, values = zip(*subset)
 
-        # Configurar a fonte para Arial
-        plt.rcParams['font.family'] = 'Arial'
-
-        # Criar o gráfico de barras
-        plt.figure(figsize=(10, 6))
-
         # Garantir que as cores sejam corretamente aplicadas:
         # 1. Se o subset contém "OUTROS" e ele é o único, ele será cinza.
         # 2. Senão, as barras do subset atual são azuis e as outras são cinza.
@@ -655,68 +436,53 @@ def criar_barra_resp_prc_destaq(df, year, filename_base, title_base):
             # As barras no subset atual serão azuis, o resto será cinza
             colors = ['#224b89' if label in labels else 'lightgray' for label in all_labels]
 
-        # Adicionar as barras
-        bars = plt.bar(all_labels, all_values, color=colors)
-
-        # Remover os eixos e bordas
-        plt.gca().spines['top'].set_visible(False)
-        plt.gca().spines['right'].set_visible(False)
-        plt.gca().spines['left'].set_visible(False)
-        plt.gca().spines['bottom'].set_visible(False)
-
-        # Remover as linhas que unem os rótulos do eixo x às barras
-        plt.gca().xaxis.tick_bottom()
-        plt.gca().tick_params(axis='x', length=0)
-
-        # Definir os rótulos do eixo x na horizontal
-        plt.xticks(rotation=0, fontsize=12, fontweight='bold')
-
-        # Remover rótulos do eixo y
-        plt.yticks([])
-
-        # Adicionar rótulos de valores acima das barras
-        for bar in bars:
-            plt.annotate(f'{bar.get_height()}', 
-                        (bar.get_x() + bar.get_width() / 2, bar.get_height()), 
-                        ha='center', va='bottom', fontsize=12, fontweight='bold')
+        # Criar o gráfico de barras
+        with grafico_barras() as (fig, ax):
+            # Adicionar as barras
+            bars = ax.bar(all_labels, all_values, color=colors)
 
-        # Adicionar uma linha fina preta como eixo x
-        plt.axhline(y=0, color='black', linewidth=2)
+            # Definir os rótulos do eixo x na horizontal e remover rótulos do eixo y
+            rotulos_x(ax, fontsize=12)
+            ax.set_yticks([])
 
-        # Adicionar título personalizado para cada gráfico
-        #title = f'{title_base} - Gráfico {i+1}'
-        plt.title(title_base, fontsize=18, fontweight='bold')
+            anotar_barras(ax, bars, fontsize=12)
+            linha_base(ax)
 
-        plt.tight_layout()
+            # Adicionar título personalizado para cada gráfico
+            #title = f'{title_base} - Gráfico {i+1}'
+            ax.set_title(title_base, fontsize=18, fontweight='bold')
 
-        # Salvar o gráfico como imagem
-        img_output = f'outputs/{year}/entregues/{filename_base}_grafico_{i+1}.png'
-        plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
+            fig.tight_layout()
 
-        plt.close()  # Fechar a figura para evitar sobreposição
+            # Salvar o gráfico como imagem
+            salvar_figura(fig, f'outputs/{year}/entregues/{filename_base}_grafico_{i+1}.png')
 
     #Criar as listas de projetos
     grupos_resp = [[item[0] for item in sublist] for sublist in subset_list]
     i = 0
     saida_lista = []
+    documentos = []
     for resp in grupos_resp:
         img_output = f'outputs/{year}/entregues/{filename_base}_lista_{i+1}.png'
         saida_lista.append(img_output)
         df_tmp = df[df['RESP_PRJ_Abr'].isin(resp)]
-        criar_lista_entregues(df_tmp,img_output)
+        documentos.append((html_lista_entregues(df_tmp, data_referencia), img_output, 500))
         i += 1
 
+    # Gerar todas as listas de uma vez no renderizador
+    renderizar_lote(documentos)
+
     return [f'outputs/{year}/entregues/{filename_base}_grafico_{i+1}.png' for i in range(len(subset_list))], saida_lista
     
 #### GRÁFICO FINANCEIRO DE BARRAS DE PROJETOS ENTREGUES POR ELOS ####
-def criar_barra_resp_prc_fin(df, year, filename, title):
+def criar_barra_resp_prc_fin(cubo, year, filename, title):
 
     # Substituir os valores que não estão na lista por 'OUTROS'
     lista_inclusao = ['CEPE','SR-BE', 'SR-BR','SR-CO','SR-MN','SR-NT','SR-RJ','SR-SJ','GAC-AN','COMARA','GECAMP']
-    df['RESP_PRJ_Abr'] = df['RESP_PRJ_Abr'].where(df['RESP_PRJ_Abr'].isin(lista_inclusao), 'OUTROS')
+    cubo = agrupar_outros(cubo, 'RESP_PRJ_Abr', lista_inclusao)
     
-    # Agrupar os dados pela coluna 'RESP_PROJ_Abr' e somar a coluna 'VALOR'
-    amounts = df[['VALOR','RESP_PRJ_Abr']].groupby('RESP_PRJ_Abr').sum()
+    # Somar a coluna 'VALOR' por 'RESP_PROJ_Abr'
+    amounts = somar(cubo, 'RESP_PRJ_Abr').to_frame()
         
     # Reordenar o DataFrame agrupado com base no valor dos projetos, em ordem decrescente
     amounts = amounts.loc[amounts.sort_values(by='VALOR',ascending=False).index]
@@ -727,65 +493,40 @@ def criar_barra_resp_prc_fin(df, year, filename, title):
         amounts = amounts.drop('OUTROS')
         amounts = pd.concat([amounts, outros])
 
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
-
     # Definir cores para as barras
     #colors = ['gray' if status not in ['PRC', 'OBI', 'OBC', 'LIA', 'OSP', 'OCN'] else '#224b89' for status in status_counts.index]
     colors = '#224b89'
 
-    # Adicionar as barras sem criar uma legenda automática
-    bars = plt.bar(amounts.index, amounts['VALOR'], color=colors)
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
-
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
-
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=12, fontweight='bold')
+    img_output = f'outputs/{year}/entregues/{filename}.png'
 
-    # Remover rótulos do eixo y
-    plt.yticks([])
+    # Criar o gráfico de barras
+    with grafico_barras() as (fig, ax):
+        # Adicionar as barras sem criar uma legenda automática
+        bars = ax.bar(amounts.index, amounts['VALOR'], color=colors)
 
-    # Adicionar rótulos de valores acima das barras
-    for bar in bars:
-        valor_milhoes = bar.get_height()/1000000
-        plt.annotate(f'R$ {valor_milhoes:.1f}Mi', 
-                    (bar.get_x() + bar.get_width() / 2, bar.get_height()), 
-                    ha='center', va='bottom', fontsize=12, fontweight='bold')
+        # Definir os rótulos do eixo x na horizontal e remover rótulos do eixo y
+        rotulos_x(ax, fontsize=12)
+        ax.set_yticks([])
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        # Adicionar rótulos de valores acima das barras, em milhões de reais
+        anotar_barras(ax, bars, fontsize=12, formatar=lambda valor: f'R$ {valor/1000000:.1f}Mi')
+        linha_base(ax)
 
-    plt.title(title, fontsize=18, fontweight='bold')
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    plt.tight_layout()
+        fig.tight_layout()
+        salvar_figura(fig, img_output)
 
-    img_output = f'outputs/{year}/entregues/{filename}.png'
-
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
-    
-    #plt.show()
     return img_output
 
 #### GRÁFICO DE BARRAS DE PROJETOS PRI E AGD POR ELOS ####
-def criar_barra_resp_prj(df, filename, title):
+def criar_barra_resp_prj(cubo, filename, title, salvar_pizzas=True):
     # Substituir os valores que não estão na lista por 'OUTROS'
     lista_inclusao = ['CEPE','SR-BE', 'SR-BR','SR-CO','SR-MN','SR-NT','SR-RJ','SR-SJ','GAC-AN','COMARA','GECAMP']
-    df['RESP_PRJ_Abr'] = df['RESP_PRJ_Abr'].where(df['RESP_PRJ_Abr'].isin(lista_inclusao), 'OUTROS')
+    cubo = agrupar_outros(cubo, 'RESP_PRJ_Abr', lista_inclusao)
     
-    # Agrupar os dados pela coluna 'STATUS' e contar as ocorrências
-    grouped = df.groupby(['RESP_PRJ_Abr','STATUS']).size().unstack(fill_value=0)
+    # Contar as ocorrências de cada 'STATUS' por responsável
+    grouped = contar_por(cubo, 'RESP_PRJ_Abr', 'STATUS')
     
     # Calcular o total de observações para cada valor de 'RESP_PRJ_Abr'
     total_por_resp = grouped.sum(axis=1)
@@ -799,12 +540,6 @@ def criar_barra_resp_prj(df, filename, title):
         grouped = grouped.drop('OUTROS')
         grouped = pd.concat([grouped, outros])
 
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
-
     # Definir cores para as barras com base no status
     colors = []
     for status in grouped.columns:
@@ -819,61 +554,47 @@ def criar_barra_resp_prj(df, filename, title):
         else:
             colors.append('lightblue')  # Cor padrão para outros status
 
-    # Iniciar a variável de base para empilhamento
-    bottom_values = np.zeros(len(grouped))
-                             
-    # Loop para empilhar as barras de acordo com cada status
-    for i, status in enumerate(grouped.columns):
-        plt.bar(grouped.index, grouped[status], bottom=bottom_values, label=status, color=colors[i], zorder = 3)
-        bottom_values += grouped[status]
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
+    img_output = f'outputs/mapas/{filename}.png'
 
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
-    plt.gca().yaxis.tick_left()
-    plt.gca().tick_params(axis='y', length=0)
+    # Criar o gráfico de barras
+    with grafico_barras(eixo_y=True) as (fig, ax):
+        # Iniciar a variável de base para empilhamento
+        bottom_values = np.zeros(len(grouped))
 
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=12, fontweight='bold')
+        # Loop para empilhar as barras de acordo com cada status
+        for i, status in enumerate(grouped.columns):
+            ax.bar(grouped.index, grouped[status], bottom=bottom_values, label=status, color=colors[i], zorder = 3)
+            bottom_values += grouped[status]
 
-    # Definir os rótulos do eixo y como inteiros
-    # Calcular o valor máximo do eixo Y como o múltiplo de 5 imediatamente superior
-    max_value = grouped.sum(axis=1).max()
-    max_y = np.ceil(max_value / 5) * 5  # Múltiplo de 5 superior
-    plt.yticks(range(0, int(max_y) + 1, 5), fontsize=12)
+        # Definir os rótulos do eixo x na horizontal
+        rotulos_x(ax, fontsize=12)
 
-    # Adicionar linhas de grade horizontais
-    plt.grid(axis='y', color='darkgray', linestyle='--', linewidth=0.7, zorder=0)
+        # Definir os rótulos do eixo y como inteiros
+        # Calcular o valor máximo do eixo Y como o múltiplo de 5 imediatamente superior
+        max_value = grouped.sum(axis=1).max()
+        max_y = np.ceil(max_value / 5) * 5  # Múltiplo de 5 superior
+        escala_y(ax, range(0, int(max_y) + 1, 5), fontsize=12)
 
-    # Adicionar a legenda personalizada e posicioná-la abaixo do gráfico
-    plt.legend(loc='upper center', fontsize=10, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 2)
+        # Adicionar linhas de grade horizontais
+        ax.grid(axis='y', color='darkgray', linestyle='--', linewidth=0.7, zorder=0)
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        # Adicionar a legenda personalizada e posicioná-la abaixo do gráfico
+        ax.legend(loc='upper center', fontsize=10, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 2)
 
-    plt.title(title, fontsize=18, fontweight='bold')
+        linha_base(ax)
 
-    # Ajustar o layout para deixar espaço para a legenda abaixo
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    img_output = f'outputs/mapas/{filename}.png'
+        # Ajustar o layout para deixar espaço para a legenda abaixo
+        fig.tight_layout()
+        fig.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
 
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
+        salvar_figura(fig, img_output)
     
-    # Criar os gráficos de pizza
+    # Dados dos gráficos de pizza de cada responsável, desenhados no mapa por create_map
     pie_output = []
 
     for resp in grouped.index:
-        plt.figure(figsize=(6, 6))
-
         # Pegar os dados de status para o responsável
         status_counts = grouped.loc[resp]
         labels = status_counts.index
@@ -893,36 +614,23 @@ def criar_barra_resp_prj(df, filename, title):
             else:
                 pie_colors.append('lightblue')
 
-        # Função para exibir os valores absolutos nas fatias, omitindo zeros
-        def absolute_value(val):
-            absolute = int(val / 100. * sum(values))  # Calcula o valor absoluto
-            return f'{absolute}' if absolute > 0 else ''  # Retorna valor ou vazio se for 0
-
-        # Criar o gráfico de pizza sem rótulos de cor, com valores em negrito
-        plt.pie(values, labels=None, colors=pie_colors, autopct=absolute_value, startangle=90, 
-                textprops={'fontsize': 36, 'fontweight': 'bold'})  # Define negrito nos valores
+        pizza = {'resp': resp, 'valores': [int(v) for v in values], 'cores': pie_colors, 'arquivo': None}
 
-        # Adicionar título centralizado abaixo da pizza
-        plt.text(0, -1.2, f'{resp}', ha='center', va='center', fontsize=36, fontweight='bold', fontname='Arial')
-
-        #plt.title(f'Gráfico de Pizza - {resp}', fontsize=18, fontweight='bold')
-
-        # Salvar o gráfico de pizza como imagem
-        pie_name = f'outputs/mapas/pizzas/{filename}_{resp}_pizza_prj.png'
-        plt.savefig(pie_name, dpi=300, bbox_inches='tight')
-        pie_output.append(pie_name)
-        plt.close()  # Fecha o gráfico de pizza
+        # Salvar o gráfico de pizza como imagem (opcional)
+        if salvar_pizzas:
+            pizza['arquivo'] = salvar_pizza(pizza, f'outputs/mapas/pizzas/{filename}_{resp}_pizza_prj.png')
+        pie_output.append(pizza)
 
     return img_output, pie_output
 
 #### GRÁFICO DE BARRAS DE OBRAS POR ELOS ####
-def criar_barra_resp_obr(df, filename, title):
+def criar_barra_resp_obr(cubo, filename, title, salvar_pizzas=True):
     # Substituir os valores que não estão na lista por 'OUTROS'
     lista_inclusao = ['CEPE','SR-BE', 'SR-BR','SR-CO','SR-MN','SR-NT','SR-RJ','SR-SJ','GAC-AN','COMARA','GECAMP','CO-FZ']
-    df['RESP_Fisc_Abr'] = df['RESP_Fisc_Abr'].where(df['RESP_Fisc_Abr'].isin(lista_inclusao), 'OUTROS')
+    cubo = agrupar_outros(cubo, 'RESP_Fisc_Abr', lista_inclusao)
     
-    # Agrupar os dados pela coluna 'STATUS' e contar as ocorrências
-    grouped = df.groupby(['RESP_Fisc_Abr','STATUS']).size().unstack(fill_value=0)
+    # Contar as ocorrências de cada 'STATUS' por responsável
+    grouped = contar_por(cubo, 'RESP_Fisc_Abr', 'STATUS')
     
     # Calcular o total de observações para cada valor de 'RESP_PRJ_Abr'
     total_por_resp = grouped.sum(axis=1)
@@ -936,12 +644,6 @@ def criar_barra_resp_obr(df, filename, title):
         grouped = grouped.drop('OUTROS')
         grouped = pd.concat([grouped, outros])
 
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
-
     # Definir cores para as barras com base no status
     colors = []
     for status in grouped.columns:
@@ -956,61 +658,47 @@ def criar_barra_resp_obr(df, filename, title):
         else:
             colors.append('lightblue')  # Cor padrão para outros status
 
-    # Iniciar a variável de base para empilhamento
-    bottom_values = np.zeros(len(grouped))
-                             
-    # Loop para empilhar as barras de acordo com cada status
-    for i, status in enumerate(grouped.columns):
-        plt.bar(grouped.index, grouped[status], bottom=bottom_values, label=status, color=colors[i], zorder = 3)
-        bottom_values += grouped[status]
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
+    img_output = f'outputs/mapas/{filename}.png'
 
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
-    plt.gca().yaxis.tick_left()
-    plt.gca().tick_params(axis='y', length=0)
+    # Criar o gráfico de barras
+    with grafico_barras(eixo_y=True) as (fig, ax):
+        # Iniciar a variável de base para empilhamento
+        bottom_values = np.zeros(len(grouped))
 
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=12, fontweight='bold')
+        # Loop para empilhar as barras de acordo com cada status
+        for i, status in enumerate(grouped.columns):
+            ax.bar(grouped.index, grouped[status], bottom=bottom_values, label=status, color=colors[i], zorder = 3)
+            bottom_values += grouped[status]
 
-    # Definir os rótulos do eixo y como inteiros
-    # Calcular o valor máximo do eixo Y como o múltiplo de 5 imediatamente superior
-    max_value = grouped.sum(axis=1).max()
-    max_y = np.ceil(max_value / 5) * 5  # Múltiplo de 5 superior
-    plt.yticks(range(0, int(max_y) + 1, 5), fontsize=12)
+        # Definir os rótulos do eixo x na horizontal
+        rotulos_x(ax, fontsize=12)
 
-    # Adicionar linhas de grade horizontais
-    plt.grid(axis='y', color='darkgray', linestyle='--', linewidth=0.7, zorder=0)
+        # Definir os rótulos do eixo y como inteiros
+        # Calcular o valor máximo do eixo Y como o múltiplo de 5 imediatamente superior
+        max_value = grouped.sum(axis=1).max()
+        max_y = np.ceil(max_value / 5) * 5  # Múltiplo de 5 superior
+        escala_y(ax, range(0, int(max_y) + 1, 5), fontsize=12)
 
-    # Adicionar a legenda personalizada e posicioná-la abaixo do gráfico
-    plt.legend(loc='upper center', fontsize=10, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 2)
+        # Adicionar linhas de grade horizontais
+        ax.grid(axis='y', color='darkgray', linestyle='--', linewidth=0.7, zorder=0)
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        # Adicionar a legenda personalizada e posicioná-la abaixo do gráfico
+        ax.legend(loc='upper center', fontsize=10, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 2)
 
-    plt.title(title, fontsize=18, fontweight='bold')
+        linha_base(ax)
 
-    # Ajustar o layout para deixar espaço para a legenda abaixo
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    img_output = f'outputs/mapas/{filename}.png'
+        # Ajustar o layout para deixar espaço para a legenda abaixo
+        fig.tight_layout()
+        fig.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
 
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
+        salvar_figura(fig, img_output)
     
-    # Criar os gráficos de pizza
+    # Dados dos gráficos de pizza de cada responsável, desenhados no mapa por create_map
     pie_output = []
 
     for resp in grouped.index:
-        plt.figure(figsize=(6, 6))
-
         # Pegar os dados de status para o responsável
         status_counts = grouped.loc[resp]
         labels = status_counts.index
@@ -1030,36 +718,26 @@ def criar_barra_resp_obr(df, filename, title):
             else:
                 pie_colors.append('lightblue')
 
-        # Função para exibir os valores absolutos nas fatias, omitindo zeros
-        def absolute_value(val):
-            absolute = int(val / 100. * sum(values))  # Calcula o valor absoluto
-            return f'{absolute}' if absolute > 0 else ''  # Retorna valor ou vazio se for 0
-
-        # Criar o gráfico de pizza sem rótulos de cor, com valores em negrito
-        plt.pie(values, labels=None, colors=pie_colors, autopct=absolute_value, startangle=90, 
-                textprops={'fontsize': 36, 'fontweight': 'bold'})  # Define negrito nos valores
-
-        # Adicionar título centralizado abaixo da pizza
-        plt.text(0, -1.2, f'{resp}', ha='center', va='center', fontsize=36, fontweight='bold', fontname='Arial')
+        pizza = {'resp': resp, 'valores': [int(v) for v in values], 'cores': pie_colors, 'arquivo': None}
 
-        #plt.title(f'Gráfico de Pizza - {resp}', fontsize=18, fontweight='bold')
-
-        # Salvar o gráfico de pizza como imagem
-        pie_name = f'outputs/mapas/pizzas/{filename}_{resp}_pizza_obr.png'
-        plt.savefig(pie_name, dpi=300, bbox_inches='tight')
-        pie_output.append(pie_name)
-        plt.close()  # Fecha o gráfico de pizza
+        # Salvar o gráfico de pizza como imagem (opcional)
+        if salvar_pizzas:
+            pizza['arquivo'] = salvar_pizza(pizza, f'outputs/mapas/pizzas/{filename}_{resp}_pizza_obr.png')
+        pie_output.append(pizza)
 
     return img_output, pie_output
 
 #### GRÁFICO DE BARRAS DE PROSPECÇÃO DE OBRAS POR ELOS ####
-def criar_barra_resp_prospec(df, filename, title):
+def criar_barra_resp_prospec(cubo, filename, title, salvar_pizzas=True):
     # Substituir os valores que não estão na lista por 'OUTROS'
     lista_inclusao = ['CEPE','SR-BE', 'SR-BR','SR-CO','SR-MN','SR-NT','SR-RJ','SR-SJ','GAC-AN','COMARA','GECAMP']
-    df['RESP_Fisc_Abr'] = df['RESP_Fisc_Abr'].where(df['RESP_Fisc_Abr'].isin(lista_inclusao), 'OUTROS')
+    cubo = agrupar_outros(cubo, 'RESP_Fisc_Abr', lista_inclusao)
+
+    # Status de projeto reunidos em uma só fase
+    cubo['STATUS_amplo'] = np.where(cubo['STATUS'].isin(['PRI', 'PRC', 'AGD', 'PII']), 'Fase de projeto (AGD, PRI, etc.)', cubo['STATUS'])
     
-    # Agrupar os dados pela coluna 'STATUS' e contar as ocorrências
-    grouped = df.groupby(['RESP_Fisc_Abr','STATUS_amplo']).size().unstack(fill_value=0)
+    # Contar as ocorrências de cada 'STATUS_amplo' por responsável
+    grouped = contar_por(cubo, 'RESP_Fisc_Abr', 'STATUS_amplo')
     
     # Calcular o total de observações para cada valor de 'RESP_PRJ_Abr'
     total_por_resp = grouped.sum(axis=1)
@@ -1073,12 +751,6 @@ def criar_barra_resp_prospec(df, filename, title):
         grouped = grouped.drop('OUTROS')
         grouped = pd.concat([grouped, outros])
 
-    # Configurar a fonte para Arial
-    plt.rcParams['font.family'] = 'Arial'
-
-    # Criar o gráfico de barras
-    plt.figure(figsize=(10, 6))
-
     # Definir cores para as barras com base no status
     colors = []
     for status in grouped.columns:
@@ -1093,61 +765,47 @@ def criar_barra_resp_prospec(df, filename, title):
         else:
             colors.append('lightblue')  # Cor padrão para outros status
 
-    # Iniciar a variável de base para empilhamento
-    bottom_values = np.zeros(len(grouped))
-                             
-    # Loop para empilhar as barras de acordo com cada status
-    for i, status in enumerate(grouped.columns):
-        plt.bar(grouped.index, grouped[status], bottom=bottom_values, label=status, color=colors[i], zorder = 3)
-        bottom_values += grouped[status]
-
-    # Remover os eixos e bordas
-    plt.gca().spines['top'].set_visible(False)
-    plt.gca().spines['right'].set_visible(False)
-    plt.gca().spines['left'].set_visible(False)
-    plt.gca().spines['bottom'].set_visible(False)
+    img_output = f'outputs/mapas/{filename}.png'
 
-    # Remover as linhas que unem os rótulos do eixo x às barras
-    plt.gca().xaxis.tick_bottom()
-    plt.gca().tick_params(axis='x', length=0)
-    plt.gca().yaxis.tick_left()
-    plt.gca().tick_params(axis='y', length=0)
+    # Criar o gráfico de barras
+    with grafico_barras(eixo_y=True) as (fig, ax):
+        # Iniciar a variável de base para empilhamento
+        bottom_values = np.zeros(len(grouped))
 
-    # Definir os rótulos do eixo x na horizontal
-    plt.xticks(rotation=0, fontsize=12, fontweight='bold')
+        # Loop para empilhar as barras de acordo com cada status
+        for i, status in enumerate(grouped.columns):
+            ax.bar(grouped.index, grouped[status], bottom=bottom_values, label=status, color=colors[i], zorder = 3)
+            bottom_values += grouped[status]
 
-    # Definir os rótulos do eixo y como inteiros
-    # Calcular o valor máximo do eixo Y como o múltiplo de 5 imediatamente superior
-    max_value = grouped.sum(axis=1).max()
-    max_y = np.ceil(max_value / 5) * 5  # Múltiplo de 5 superior
-    plt.yticks(range(0, int(max_y) + 1, 5), fontsize=12)
+        # Definir os rótulos do eixo x na horizontal
+        rotulos_x(ax, fontsize=12)
 
-    # Adicionar linhas de grade horizontais
-    plt.grid(axis='y', color='darkgray', linestyle='--', linewidth=0.7, zorder=0)
+        # Definir os rótulos do eixo y como inteiros
+        # Calcular o valor máximo do eixo Y como o múltiplo de 5 imediatamente superior
+        max_value = grouped.sum(axis=1).max()
+        max_y = np.ceil(max_value / 5) * 5  # Múltiplo de 5 superior
+        escala_y(ax, range(0, int(max_y) + 1, 5), fontsize=12)
 
-    # Adicionar a legenda personalizada e posicioná-la abaixo do gráfico
-    plt.legend(loc='upper center', fontsize=10, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 2)
+        # Adicionar linhas de grade horizontais
+        ax.grid(axis='y', color='darkgray', linestyle='--', linewidth=0.7, zorder=0)
 
-    # Adicionar uma linha fina preta como eixo x
-    plt.axhline(y=0, color='black', linewidth=2)
+        # Adicionar a legenda personalizada e posicioná-la abaixo do gráfico
+        ax.legend(loc='upper center', fontsize=10, frameon=False, borderpad=1, bbox_to_anchor=(0.5, -0.1), ncol = 2)
 
-    plt.title(title, fontsize=18, fontweight='bold')
+        linha_base(ax)
 
-    # Ajustar o layout para deixar espaço para a legenda abaixo
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
+        ax.set_title(title, fontsize=18, fontweight='bold')
 
-    img_output = f'outputs/mapas/{filename}.png'
+        # Ajustar o layout para deixar espaço para a legenda abaixo
+        fig.tight_layout()
+        fig.subplots_adjust(bottom=0.2)  # Aumenta o espaçamento inferior
 
-    # Salvar o gráfico como imagem
-    plt.savefig(img_output, dpi=300, bbox_inches='tight')  # Salva como PNG
+        salvar_figura(fig, img_output)
     
-    # Criar os gráficos de pizza
+    # Dados dos gráficos de pizza de cada responsável, desenhados no mapa por create_map
     pie_output = []
 
     for resp in grouped.index:
-        plt.figure(figsize=(6, 6))
-
         # Pegar os dados de status para o responsável
         status_counts = grouped.loc[resp]
         labels = status_counts.index
@@ -1167,38 +825,58 @@ def criar_barra_resp_prospec(df, filename, title):
             else:
                 pie_colors.append('lightblue')
 
-        # Função para exibir os valores absolutos nas fatias, omitindo zeros
-        def absolute_value(val):
-            absolute = int(val / 100. * sum(values))  # Calcula o valor absoluto
-            return f'{absolute}' if absolute > 0 else ''  # Retorna valor ou vazio se for 0
+        pizza = {'resp': resp, 'valores': [int(v) for v in values], 'cores': pie_colors, 'arquivo': None}
 
-        # Criar o gráfico de pizza sem rótulos de cor, com valores em negrito
-        plt.pie(values, labels=None, colors=pie_colors, autopct=absolute_value, startangle=90, 
-                textprops={'fontsize': 36, 'fontweight': 'bold'})  # Define negrito nos valores
-
-        # Adicionar título centralizado abaixo da pizza
-        plt.text(0, -1.2, f'{resp}', ha='center', va='center', fontsize=36, fontweight='bold', fontname='Arial')
-
-        #plt.title(f'Gráfico de Pizza - {resp}', fontsize=18, fontweight='bold')
-
-        # Salvar o gráfico de pizza como imagem
-        pie_name = f'outputs/mapas/pizzas/{filename}_{resp}_pizza_prospec.png'
-        plt.savefig(pie_name, dpi=300, bbox_inches='tight')
-        pie_output.append(pie_name)
-        plt.close()  # Fecha o gráfico de pizza
+        # Salvar o gráfico de pizza como imagem (opcional)
+        if salvar_pizzas:
+            pizza['arquivo'] = salvar_pizza(pizza, f'outputs/mapas/pizzas/{filename}_{resp}_pizza_prospec.png')
+        pie_output.append(pizza)
 
     return img_output, pie_output
 
+#### GRÁFICOS DE PIZZA POR ELO ####
+def desenhar_pizza(fig, pizza):
+    ax = fig.add_subplot()
+    values = np.array(pizza['valores'])  # Como array, para o total nas fatias ser calculado igual ao original
+
+    # Função para exibir os valores absolutos nas fatias, omitindo zeros
+    def absolute_value(val):
+        absolute = int(val / 100. * sum(values))  # Calcula o valor absoluto
+        return f'{absolute}' if absolute > 0 else ''  # Retorna valor ou vazio se for 0
+
+    # Criar o gráfico de pizza sem rótulos de cor, com valores em negrito
+    ax.pie(values, labels=None, colors=pizza['cores'], autopct=absolute_value, startangle=90, 
+           textprops={'fontsize': 36, 'fontweight': 'bold'})  # Define negrito nos valores
+
+    # Adicionar título centralizado abaixo da pizza
+    ax.text(0, -1.2, f"{pizza['resp']}", ha='center', va='center', fontsize=36, fontweight='bold', fontname='Arial')
+
+def salvar_pizza(pizza, pie_name):
+    # Pizza em 300 dpi, como arquivo
+    with figura(figsize=(6, 6)) as fig:
+        desenhar_pizza(fig, pizza)
+        return salvar_figura(fig, pie_name)
+
+def pizza_rgba(pizza, tamanho, superamostragem=2):
+    # Pizza renderizada em memória, com fundo transparente, já perto do tamanho final
+    buffer = io.BytesIO()
+    with figura(figsize=(6, 6)) as fig:
+        desenhar_pizza(fig, pizza)
+        bbox = fig.get_tightbbox(fig.canvas.get_renderer())
+        dpi = superamostragem * max(tamanho) / max(bbox.width, bbox.height)
+        fig.savefig(buffer, format='png', dpi=dpi, bbox_inches='tight', transparent=True)
+
+    buffer.seek(0)
+    return Image.open(buffer).convert("RGBA").resize(tamanho, Image.LANCZOS)
+
 #### TABELA DE JUSTIFICATIVAS ####
-def criar_justificativas(df, year, filename):
-    
+def resumo_justificativas(df):
+    # Colunas exibidas, já formatadas e ordenadas pelo ID
     summary_df = df[['ID-PW','OM','DESCRIÇÃO','CN','ETPE','TAP ass','TEP ass','VALOR','RECURSO','RESPONSAVEL PROJETO','PRAZO PROJETO VIGENTE + PTA','Justificativa','%PRJ']]
 
     # Formatar a coluna 'Total Valor (R$)' no formato brasileiro
     summary_df['VALOR'] = pd.to_numeric(summary_df['VALOR'], errors='coerce').fillna(0)
-    summary_df['VALOR'] = summary_df['VALOR'].apply(
-        lambda x: f"R$ {x:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    )
+    summary_df['VALOR'] = formatar_brl(summary_df['VALOR'])
 
     # Ordenar o DataFrame pelo campo 'ID-PW'
     summary_df = summary_df.sort_values(by='ID-PW')
@@ -1211,10 +889,21 @@ def criar_justificativas(df, year, filename):
     summary_df['ETPE'] = pd.to_numeric(summary_df['ETPE'], errors='coerce').fillna(0).astype(int)  # Converte para numérico, substitui NaN por 0
     summary_df['TAP'] = pd.to_numeric(summary_df['TAP'], errors='coerce').fillna(0).astype(int)  # Converte para numérico, substitui NaN por 0
     summary_df['TEP'] = pd.to_numeric(summary_df['TEP'], errors='coerce').fillna(0).astype(int)  # Converte para numérico, substitui NaN por 0
-    summary_df['%PRJ'] = pd.to_numeric(summary_df['%PRJ'], errors='coerce').fillna(0)
+
+    # %PRJ inteiro (69%); decimal (69.0%) só se houver vazios no próprio recorte, como quando a
+    # coluna era convertida aqui a partir do texto
+    prj = pd.to_numeric(summary_df['%PRJ'], errors='coerce')
+    if prj.isna().any():
+        prj = prj.astype('float64')
+    summary_df['%PRJ'] = prj.fillna(0)
 
     # Formatar a coluna 'Prazo proj.' no formato 'YYYY-MM-DD'
-    summary_df['Prazo proj.'] = pd.to_datetime(summary_df['Prazo proj.']).dt.strftime('%Y-%m-%d')
+    summary_df['Prazo proj.'] = summary_df['Prazo proj.'].dt.strftime('%Y-%m-%d')
+
+    return summary_df
+
+def html_justificativas(summary_df):
+    # Tabela de um resumo já preparado (ver resumo_justificativas) ou de uma página dele
 
     # Geração do HTML com estilos
     
@@ -1320,82 +1009,92 @@ def criar_justificativas(df, year, filename):
     </style>
     """
 
-    # Construindo a tabela HTML manualmente
-    html_table = '<table class="main-table"><thead><tr>'
-    html_table += ''.join(f'<th>{col}</th>' for col in summary_df.columns)  # Cabeçalho
-    html_table += '</tr></thead><tbody>'
-
-    for index, row in summary_df.iterrows():
-        html_table += '<tr>'
-        for col in summary_df.columns:
-            # Aplicando classes CSS apenas para a coluna CN
-            if col in ['CN', 'ETPE', 'TAP', 'TEP']:
-                if row[col] == 1:
-                    html_table += f'<td class="cn-blue">{row[col]}</td>'
-                elif row[col] == 0:
-                    html_table += f'<td class="cn-red">{row[col]}</td>'
-                else:
-                    html_table += f'<td>{row[col]}</td>'
-            # Aplicar a barra de progresso para a coluna de andamento (%)
-            elif col == '%PRJ':
-                percent = row[col]
-                html_table += f'''
-                <td>
-                    <div class="progress-bar">
-                        <div class="progress-bar-fill" style="width: {percent}%;">{percent}%</div>
-                    </div>
-                </td>'''
-            else:
-                html_table += f'<td>{row[col]}</td>'  # Para as outras colunas, sem estilização
-        html_table += '</tr>'
-    
-    html_table += '</tbody></table>'
+    # Tabela montada coluna a coluna: indicadores coloridos, barra de progresso no %PRJ
+    # e as demais colunas sem estilização
+    colunas = []
+    for col in summary_df.columns:
+        if col in ['CN', 'ETPE', 'TAP', 'TEP']:
+            colunas.append(celulas_indicador(summary_df[col]))
+        elif col == '%PRJ':
+            colunas.append(celulas_progresso(summary_df[col]))
+        else:
+            colunas.append(celulas(summary_df[col]))
+    html_table = montar_tabela(colunas, summary_df.columns)
 
     # Combinando o estilo e a tabela HTML
     html_output = f"{style}\n{html_table}"
 
-    # Salvando a tabela como arquivo HTML
-    html_path = 'tabela_resumo_formatado.html'
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_output)
-
-    # Configurações para gerar a imagem
-    img_options = {
-        'format': 'png',
-        'encoding': 'UTF-8',
-        'width': 500 
-    }
+    return html_output
 
-    # Converter o HTML em imagem (PNG)
+def criar_justificativas(df, year, filename, linhas_por_pagina=None, emendar=False):
+    summary_df = resumo_justificativas(df)
     img_output = f'outputs/{year}/justificativas/{filename}.png'
-    imgkit.from_file(html_path, img_output, options=img_options)
-
-    # Excluir o arquivo HTML após gerar a imagem
-    if os.path.exists(html_path):
-        os.remove(html_path)
-        print(f"Arquivo HTML '{html_path}' excluído com sucesso.")
-
-    # Abrir a imagem e obter suas dimensões
-    with Image.open(img_output) as img:
-        width, height = img.size
-        print(f"Dimensões da imagem: {width}x{height} pixels")
 
+    # Tabelas até linhas_por_pagina linhas (ou sem paginação) geram uma única imagem
+    if not linhas_por_pagina or len(summary_df) <= linhas_por_pagina:
+        remover_paginas(img_output)
+
+        # Converter o HTML em imagem (PNG)
+        png = html_para_png(html_justificativas(summary_df), largura=500)
+        gravar_png(png, img_output)
+
+        # Obter as dimensões da imagem a partir do PNG em memória
+        with Image.open(io.BytesIO(png)) as img:
+            width, height = img.size
+            print(f"Dimensões da imagem: {width}x{height} pixels")
+
+        return img_output
+
+    # Tabelas maiores são divididas em páginas de linhas_por_pagina linhas, renderizadas em
+    # paralelo (_p01, _p02, ...); com emendar, as páginas também são unidas na imagem original
+    remover_paginas(img_output)
+    if not emendar and os.path.exists(img_output):
+        os.remove(img_output)
+
+    inicios = range(0, len(summary_df), linhas_por_pagina)
+    digitos = max(2, len(str(len(inicios))))
+    documentos = [(html_justificativas(summary_df.iloc[inicio:inicio + linhas_por_pagina]),
+                   img_output.replace('.png', f'_p{numero:0{digitos}d}.png'), 500)
+                  for numero, inicio in enumerate(inicios, start=1)]
+    paginas = renderizar_lote(documentos)
+    print(f"{filename}: {len(summary_df)} linhas em {len(paginas)} páginas")
+
+    emendada = emendar_paginas(paginas, img_output) if emendar else None
+    return {'paginas': paginas, 'emendada': emendada}
+
+def remover_paginas(img_output):
+    # Páginas deixadas por uma execução anterior da mesma tabela
+    pasta, nome = os.path.split(img_output)
+    padrao = re.compile(re.escape(nome[:-len('.png')]) + r'_p\d+\.png$')
+    for arquivo in os.listdir(pasta or '.'):
+        if padrao.match(arquivo):
+            os.remove(os.path.join(pasta, arquivo))
+
+def emendar_paginas(paginas, img_output):
+    # Páginas uma embaixo da outra, numa única imagem
+    imagens = [Image.open(pagina).convert('RGB') for pagina in paginas]
+    emendada = Image.new('RGB', (max(img.width for img in imagens), sum(img.height for img in imagens)), 'white')
+    topo = 0
+    for img in imagens:
+        emendada.paste(img, (0, topo))
+        topo += img.height
+        img.close()
+    emendada.save(img_output)
+    print(f"Dimensões da imagem: {emendada.width}x{emendada.height} pixels")
     return img_output
 
 #### TABELA DE PROJETOS ENTREGUES POR ELOS ####
-def criar_lista_entregues(df, img_output):
+def html_lista_entregues(df, data_referencia=None):
 
-    # Definir a data de corte (data de hoje - 30 dias)
-    data_limite = datetime.now() - timedelta(days=30)
+    # Definir a data de corte (data de referência - 30 dias)
+    if data_referencia is None:
+        data_referencia = datetime.now()
+    data_limite = pd.Timestamp(data_referencia) - timedelta(days=30)
 
-    # Converter a coluna para datetime, ignorando erros
-    df['DATA de assinatura do TEP pelo cliente'] = pd.to_datetime(df['DATA de assinatura do TEP pelo cliente'], errors='coerce', dayfirst=True)
-
-    # Adicionar uma coluna indicando se a linha deve ser destacada
-    df['destacar'] = df['DATA de assinatura do TEP pelo cliente'].apply(lambda x: 'destacar' if pd.notna(x) and x > data_limite else '')
-
-    # Seleção das colunas a serem exibidas
-    summary_df = df[['ID-PW', 'DESCRIÇÃO', 'OM', 'destacar']]
+    # Seleção das colunas a serem exibidas, com a indicação das linhas a destacar
+    # (TEP assinado depois da data de corte; a coluna já vem em datetime64 da ingestão)
+    destacar = np.where(df['DATA de assinatura do TEP pelo cliente'] > data_limite, 'destacar', '')
+    summary_df = df[['ID-PW', 'DESCRIÇÃO', 'OM']].assign(destacar=destacar)
 
     # Geração do HTML com estilos
     style = """
@@ -1454,102 +1153,89 @@ def criar_lista_entregues(df, img_output):
     </style>
     """
 
-    # Gerando o corpo da tabela manualmente com destaque para as linhas
-    html_table = f"<table class='main-table'><thead><tr><th>ID-PW</th><th>DESCRIÇÃO</th><th>OM</th></tr></thead><tbody>"
-    
-    for _, row in summary_df.iterrows():
-        class_name = row['destacar']  # Verifica se a linha deve ser destacada
-        html_table += f"<tr class='{class_name}'><td>{row['ID-PW']}</td><td>{row['DESCRIÇÃO']}</td><td>{row['OM']}</td></tr>"
-    
-    html_table += "</tbody></table>"
+    # Corpo da tabela com a classe de destaque em cada linha
+    colunas = [celulas(summary_df[col]) for col in ['ID-PW', 'DESCRIÇÃO', 'OM']]
+    aberturas = "<tr class='" + summary_df['destacar'].to_numpy(dtype=object) + "'>"
+    html_table = montar_tabela(colunas, ['ID-PW', 'DESCRIÇÃO', 'OM'], abertura="<table class='main-table'>", aberturas_linhas=aberturas)
 
     # Combinando o estilo e a tabela HTML
     html_output = f"{style}\n{html_table}"
 
-    # Salvando a tabela como arquivo HTML
-    html_path = 'lista_entregues.html'
-    with open(html_path, 'w', encoding='utf-8') as f:
-        f.write(html_output)
-
-    # Configurações para gerar a imagem
-    img_options = {
-        'format': 'png',
-        'encoding': 'UTF-8',
-        'width': 500 
-    }
+    return html_output
 
+def criar_lista_entregues(df, img_output, data_referencia=None):
     # Converter o HTML em imagem (PNG)
-    #img_output = f'outputs/{filename}.png'
-    imgkit.from_file(html_path, img_output, options=img_options)
-
-    # Excluir o arquivo HTML após gerar a imagem
-    if os.path.exists(html_path):
-        os.remove(html_path)
-        print(f"Arquivo HTML '{html_path}' excluído com sucesso.")
+    renderizar_html(html_lista_entregues(df, data_referencia), img_output, largura=500)
 
     return img_output
 
-def create_map(images, filename):
+def remover_fundo_branco(image, limiar=200, suavizacao=0):
+    # Torna transparentes os pixels brancos (ou quase brancos), operando sobre o array da imagem
+    pixels = np.array(image.convert("RGBA"))
+    menor_canal = np.minimum(np.minimum(pixels[..., 0], pixels[..., 1]), pixels[..., 2])
+
+    if suavizacao <= 0:
+        # Pixels com os três canais acima do limiar ficam transparentes
+        pixels[menor_canal > limiar] = (255, 255, 255, 0)
+    else:
+        # Borda anti-serrilhada: a opacidade cai gradualmente nos 'suavizacao' tons
+        # abaixo do limiar e zera acima dele
+        fator = np.clip((limiar + 1 - menor_canal.astype(np.float32)) / (suavizacao + 1), 0, 1)
+        pixels[..., 3] = np.round(pixels[..., 3] * fator).astype(np.uint8)
+        pixels[fator == 0] = (255, 255, 255, 0)
+
+    return Image.fromarray(pixels, "RGBA")
+
+def posicao_pizza(nome):
+    # Posição de cada responsável no mapa
+    if 'CEPE' in nome:
+        return (525,540)
+    elif 'SR-MN' in nome:
+        return (70,70)
+    elif 'COMARA' in nome:
+        return (250,110)
+    elif 'SR-BE' in nome:
+        return (410,50)
+    elif 'SR-NT' in nome:
+        return (550,170)
+    elif 'SR-BR' in nome:
+        return (390,260)
+    elif 'SR-RJ' in nome:
+        return (500,380)
+    elif 'SR-SJ' in nome:
+        return (325,400)
+    elif 'SR-CO' in nome:
+        return (335,540)
+    elif 'GECAMP' in nome:
+        return (70,350)
+    elif 'GAC-AN' in nome:
+        return (255,260)
+    else:
+        return (70,540)
+
+def create_map(images, filename, limiar=200, suavizacao=0):
     # Abrir a imagem do mapa
     map_image = Image.open('mapa_branco.png').convert("RGBA")
 
-    pizza_images= []
-
-    for image in images:
-        if 'CEPE' in image:
-            pizza_images.append((image,(525,540)))
-        elif 'SR-MN' in image:
-            pizza_images.append((image,(70,70)))
-        elif 'COMARA' in image:
-            pizza_images.append((image,(250,110)))
-        elif 'SR-BE' in image:
-            pizza_images.append((image,(410,50)))
-        elif 'SR-NT' in image:
-            pizza_images.append((image,(550,170)))
-        elif 'SR-BR' in image:
-            pizza_images.append((image,(390,260)))
-        elif 'SR-RJ' in image:
-            pizza_images.append((image,(500,380)))
-        elif 'SR-SJ' in image:
-            pizza_images.append((image,(325,400)))
-        elif 'SR-CO' in image:
-            pizza_images.append((image,(335,540)))
-        elif 'GECAMP' in image:
-            pizza_images.append((image,(70,350)))
-        elif 'GAC-AN' in image:
-            pizza_images.append((image,(255,260)))
-        else:
-            pizza_images.append((image,(70,540)))
-
     # Tamanho desejado para os gráficos de pizza (largura, altura)
     new_size = (135, 135)  # Altere para o tamanho desejado
 
-    # Função para remover o fundo branco
-    def remove_white_background(image):
-        # Convertendo a imagem para RGBA
-        image = image.convert("RGBA")
-        data = image.getdata()
-        
-        new_data = []
-        for item in data:
-            # Alterar pixels brancos (ou quase brancos) para transparentes
-            if item[0] > 200 and item[1] > 200 and item[2] > 200:  # Ajuste o limiar conforme necessário
-                new_data.append((255, 255, 255, 0))  # Tornar transparente
-            else:
-                new_data.append(item)
-        
-        image.putdata(new_data)
-        return image
-
     # Sobrepor cada gráfico de pizza no mapa
-    for pizza_path, position in pizza_images:
-        pizza_image = Image.open(pizza_path)  # Não precisa converter ainda
-        
-        # Remover fundo branco
-        pizza_image = remove_white_background(pizza_image)
+    for pizza in images:
+        if isinstance(pizza, dict):
+            # Pizza desenhada direto no tamanho do mapa, já com fundo transparente
+            pizza_image = pizza_rgba(pizza, new_size)
+            position = posicao_pizza(pizza['resp'])
+        else:
+            # Caminho de uma pizza salva em 300 dpi
+            pizza_image = Image.open(pizza)  # Não precisa converter ainda
+            position = posicao_pizza(pizza)
+
+            # Remover fundo branco
+            pizza_image = remover_fundo_branco(pizza_image, limiar, suavizacao)
 
-        # Redimensionar a imagem de pizza
-        pizza_image = pizza_image.resize(new_size, Image.LANCZOS)  # Usando LANCZOS para qualidade
+            # Redimensionar a imagem de pizza
+            pizza_image = pizza_image.resize(new_size, Image.LANCZOS)  # Usando LANCZOS para qualidade
 
         # Colar a pizza no mapa, preservando a transparência
         map_image.paste(pizza_image, position, pizza_image)  # Usar a imagem com canal alfa como máscara
@@ -1557,4 +1243,4 @@ def create_map(images, filename):
     # Salvar a nova imagem resultante
     map_image.save(f'outputs/mapas/{filename}.png', format='PNG')
 
-    return f'outputs/mapas/{filename}.png'
\ No newline at end of file
+    return f'outputs/mapas/{filename}.png'
@@ -0,0 +1,157 @@
+import os
+import json
+import hashlib
+import inspect
+import functools
+from datetime import datetime
+import pandas as pd
+
+#### IMPRESSÃO DIGITAL DAS ENTRADAS ####
+def atualizar_hash(h, valor):
+    if isinstance(valor, pd.DataFrame):
+        h.update(b'DataFrame')
+        h.update('|'.join(map(str, valor.columns)).encode('utf-8'))
+        h.update(pd.util.hash_pandas_object(valor, index=False).values.tobytes())
+    elif isinstance(valor, pd.Series):
+        h.update(b'Series')
+        h.update(pd.util.hash_pandas_object(valor, index=False).values.tobytes())
+    elif isinstance(valor, (list, tuple)):
+        h.update(b'[')
+        for item in valor:
+            atualizar_hash(h, item)
+        h.update(b']')
+    elif isinstance(valor, dict):
+        h.update(b'{')
+        for chave in sorted(valor, key=str):
+            atualizar_hash(h, chave)
+            atualizar_hash(h, valor[chave])
+        h.update(b'}')
+    elif isinstance(valor, str) and os.path.isfile(valor):
+        # Arquivos de entrada (ex.: pizzas do mapa) entram pelo conteúdo
+        h.update(b'arquivo')
+        with open(valor, 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    else:
+        h.update(repr(valor).encode('utf-8'))
+
+# Módulos de que as funções criar_* dependem para desenhar as imagens (gráficos, tabelas,
+# formatação de valores, agregações, renderização do HTML e montagem das tarefas)
+MODULOS_RENDERIZACAO = ['helpers', 'graficos', 'tabela_html', 'moeda', 'cubo', 'renderizador', 'relatorio']
+
+# Arquivos lidos pelas funções criar_* a partir da pasta de trabalho (ex.: o mapa de fundo)
+ARQUIVOS_RENDERIZACAO = ['mapa_branco.png']
+
+@functools.lru_cache(maxsize=None)
+def versao_codigo(arquivo):
+    # Hash do código do módulo da função, dos módulos de renderização e dos arquivos que elas
+    # leem: mudar qualquer um deles refaz as imagens
+    pasta = os.path.dirname(os.path.abspath(__file__))
+    arquivos = [os.path.abspath(arquivo)] + [os.path.join(pasta, f'{modulo}.py') for modulo in MODULOS_RENDERIZACAO]
+    arquivos += [os.path.abspath(arquivo) for arquivo in ARQUIVOS_RENDERIZACAO if os.path.exists(arquivo)]
+    h = hashlib.sha256()
+    for caminho in sorted(set(arquivos)):
+        h.update(os.path.basename(caminho).encode('utf-8'))
+        with open(caminho, 'rb') as f:
+            h.update(hashlib.sha256(f.read()).digest())
+    return h.hexdigest()
+
+def impressao_digital(funcao, args, kwargs, contexto=None):
+    h = hashlib.sha256()
+
+    # O código também entra, para refazer as imagens quando ele mudar
+    h.update(funcao.__qualname__.encode('utf-8'))
+    h.update(versao_codigo(inspect.getsourcefile(funcao)).encode('utf-8'))
+
+    # Contexto comum a todas as tarefas (ex.: a especificação do relatório)
+    atualizar_hash(h, contexto)
+    atualizar_hash(h, list(args))
+    atualizar_hash(h, kwargs)
+    return h.hexdigest()
+
+def arquivos_gerados(resultado):
+    # Caminhos de imagem contidos no retorno de uma função criar_*
+    if isinstance(resultado, str):
+        return [resultado] if resultado.endswith('.png') else []
+    if isinstance(resultado, (list, tuple)):
+        return [arquivo for item in resultado for arquivo in arquivos_gerados(item)]
+    if isinstance(resultado, dict):
+        return arquivos_gerados(list(resultado.values()))
+    return []
+
+#### MANIFESTO DAS SAÍDAS ####
+# O arquivo é regravado a cada SALVAR_A_CADA tarefas concluídas e ao fim da execução (uma
+# interrupção perde no máximo as últimas, que são refeitas na próxima execução)
+SALVAR_A_CADA = 20
+
+class Manifesto:
+    def __init__(self, caminho, forcar=False, contexto=None):
+        # contexto: entra na impressão digital de todas as tarefas
+        self.caminho = caminho
+        self.forcar = forcar
+        self.contexto = contexto
+        self.entradas = {}
+        self.reaproveitadas = 0
+        self.geradas = 0
+        self.pendentes = 0
+
+        if os.path.exists(caminho):
+            with open(caminho, 'r', encoding='utf-8') as f:
+                self.entradas = json.load(f)
+
+    def chave(self, funcao, args, kwargs):
+        # Identifica a chamada pelo nome da função e pelos parâmetros textuais (ano, arquivo, título)
+        textos = [str(a) for a in args if isinstance(a, str)]
+        textos += [f'{k}={v}' for k, v in sorted(kwargs.items()) if isinstance(v, str)]
+        return f"{funcao.__name__}:{'/'.join(textos)}"
+
+    def atualizado(self, chave, impressao):
+        entrada = self.entradas.get(chave)
+        if self.forcar or entrada is None or entrada['impressao'] != impressao:
+            return False
+        return all(os.path.exists(arquivo) for arquivo in arquivos_gerados(entrada['resultado']))
+
+    def registrar(self, chave, impressao, resultado):
+        self.geradas += 1
+        self.entradas[chave] = {
+            'impressao': impressao,
+            'resultado': resultado,
+            'gerado_em': datetime.now().isoformat(timespec='seconds'),
+        }
+        self.pendentes += 1
+        if self.pendentes >= SALVAR_A_CADA:
+            self.salvar()
+
+    def consultar(self, funcao, args, kwargs, reaproveitar=True):
+        # Retorna a chave, a impressão digital e o resultado anterior (None se precisar refazer
+        # ou se reaproveitar for falso)
+        chave = self.chave(funcao, args, kwargs)
+        impressao = impressao_digital(funcao, args, kwargs, self.contexto)
+
+        if reaproveitar and self.atualizado(chave, impressao):
+            self.reaproveitadas += 1
+            return chave, impressao, self.entradas[chave]['resultado']
+        return chave, impressao, None
+
+    def executar(self, funcao, *args, **kwargs):
+        # Só chama a função se as entradas mudaram desde a última execução
+        chave, impressao, resultado = self.consultar(funcao, args, kwargs)
+        if resultado is not None:
+            return resultado
+
+        resultado = funcao(*args, **kwargs)
+        self.registrar(chave, impressao, resultado)
+        self.salvar_pendentes()
+        return resultado
+
+    def salvar_pendentes(self):
+        # Grava as tarefas registradas desde a última gravação, se houver
+        if self.pendentes:
+            self.salvar()
+
+    def salvar(self):
+        # Arquivo temporário substituído de uma vez: uma interrupção não corrompe o manifesto
+        self.pendentes = 0
+        os.makedirs(os.path.dirname(self.caminho) or '.', exist_ok=True)
+        with open(self.caminho + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(self.entradas, f, indent=2, ensure_ascii=False)
+        os.replace(self.caminho + '.tmp', self.caminho)
@@ -0,0 +1,68 @@
+import os
+import sys
+import tracemalloc
+
+# Medição de memória opcional (pip install psutil); sem ela, usa /proc (Linux) ou resource (Unix)
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+#### MEMÓRIA DO PROCESSO ####
+def rss_mb():
+    # Memória residente atual do processo, em MB (None se não houver como medir)
+    if psutil is not None:
+        return psutil.Process().memory_info().rss / 2**20
+    try:
+        with open('/proc/self/status') as f:
+            for linha in f:
+                if linha.startswith('VmRSS:'):
+                    return int(linha.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+def pico_rss_mb():
+    # Maior memória residente atingida pelo processo até agora, em MB
+    if resource is not None:
+        pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # Linux informa em KB, macOS em bytes
+        return pico / 2**20 if sys.platform == 'darwin' else pico / 1024
+    if psutil is not None:
+        info = psutil.Process().memory_info()
+        return getattr(info, 'peak_wset', info.rss) / 2**20
+    return None
+
+#### MEDIÇÃO POR TAREFA ####
+def executar_medindo(funcao, args, kwargs, rastrear=False):
+    # Executa a função e informa a memória do processo ao final. Com rastrear, também o pico
+    # das alocações feitas pela tarefa (tracemalloc), que deixa a execução mais lenta
+    if rastrear:
+        tracemalloc.start()
+    try:
+        resultado = funcao(*args, **kwargs)
+        pico_alocado = tracemalloc.get_traced_memory()[1] / 2**20 if rastrear else None
+    finally:
+        if rastrear:
+            tracemalloc.stop()
+
+    memoria = {
+        'pid': os.getpid(),
+        'rss_mb': rss_mb(),
+        'pico_alocado_mb': pico_alocado,
+    }
+    return resultado, memoria
+
+def descrever(memoria):
+    # Trecho da linha de progresso de cada tarefa
+    partes = []
+    if memoria.get('rss_mb') is not None:
+        partes.append(f"RSS {memoria['rss_mb']:.0f} MB")
+    if memoria.get('pico_alocado_mb') is not None:
+        partes.append(f"pico alocado {memoria['pico_alocado_mb']:.1f} MB")
+    return f" ({', '.join(partes)})" if partes else ''
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+# Conversões de valores em reais sobre colunas inteiras, com os kernels de texto do pyarrow
+
+#### LEITURA DE VALORES EM REAIS ####
+def ler_brl(serie):
+    # 'R$ 1.234,56' -> 1234.56. Aceita o símbolo com ou sem espaço, sinal negativo e vazios;
+    # texto que não for um valor vira NaN
+    texto = pa.array(serie.to_numpy(dtype=object), type=pa.string(), from_pandas=True)
+    for trecho in ['R$', '.', ' ', '\xa0']:
+        texto = pc.replace_substring(texto, trecho, '')
+    texto = pc.replace_substring(texto, ',', '.')
+
+    # A conversão final é a do pandas, cujo arredondamento no último dígito difere do pyarrow
+    # em valores muito grandes (ex.: 123.456.789.012.345,67)
+    valido = pc.match_substring_regex(texto, r'^-?[0-9]+(\.[0-9]+)?$')
+    numeros = pc.if_else(valido, texto, pa.scalar(None, pa.string())).to_numpy(zero_copy_only=False)
+    return pd.to_numeric(pd.Series(numeros, index=serie.index, name=serie.name), errors='coerce').astype('float64')
+
+#### FORMATAÇÃO DE VALORES EM REAIS ####
+def formatar_brl_um(valor):
+    # Um único valor, como f"R$ {valor:,.2f}" com os separadores brasileiros
+    return f"R$ {valor:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+def texto_inteiros(inteiros, digitos=1):
+    # Inteiros não negativos como texto, com zeros à esquerda até o número de dígitos
+    return pc.utf8_lpad(pc.cast(pa.array(inteiros), pa.string()), digitos, '0')
+
+def agrupar_milhares(inteiros):
+    # Inteiros não negativos -> texto com ponto a cada três dígitos
+    restante = inteiros // 1000
+    texto = pc.if_else(pa.array(restante > 0), texto_inteiros(inteiros % 1000, 3), texto_inteiros(inteiros % 1000))
+    while restante.any():
+        acima = restante // 1000
+        grupo = pc.if_else(pa.array(acima > 0), texto_inteiros(restante % 1000, 3), texto_inteiros(restante % 1000))
+        texto = pc.if_else(pa.array(restante > 0), pc.binary_join_element_wise(grupo, texto, '.'), texto)
+        restante = acima
+    return texto
+
+def formatar_brl(serie):
+    # 1234.5 -> 'R$ 1.234,50', com o mesmo resultado de formatar_brl_um para cada valor
+    valores = serie.to_numpy(dtype=float)
+    with np.errstate(over='ignore'):
+        escalados = np.abs(valores) * 100
+
+    # Valores a meio centavo (onde arredondar x * 100 pode divergir do arredondamento decimal
+    # exato), não finitos ou grandes demais seguem pela formatação do Python, um a um
+    with np.errstate(invalid='ignore'):
+        um_a_um = ~np.isfinite(escalados) | (escalados >= 2**53)
+        escalados = np.where(um_a_um, 0.0, escalados)
+        um_a_um |= np.abs(escalados - np.floor(escalados) - 0.5) <= 4 * np.spacing(escalados)
+
+    centavos = np.rint(escalados).astype(np.int64)
+    sinal = pa.array(np.where(np.signbit(valores), '-', ''))
+    texto = pc.binary_join_element_wise('R$ ', sinal, agrupar_milhares(centavos // 100), ',',
+                                        texto_inteiros(centavos % 100, 2), '')
+
+    resultado = texto.to_numpy(zero_copy_only=False)
+    for posicao in np.flatnonzero(um_a_um):
+        resultado[posicao] = formatar_brl_um(valores[posicao])
+    return pd.Series(resultado, index=serie.index, name=serie.name)
@@ -0,0 +1,189 @@
+import os
+import sys
+import glob
+import time
+import pstats
+import cProfile
+import functools
+import threading
+from collections import Counter
+
+#### PERFIL DAS TAREFAS ####
+# Cada tarefa perfilada gera, em outputs/_profile, pilhas no formato recolhido para flame
+# graphs (<tarefa>.folded, para flamegraph.pl ou https://www.speedscope.app; valores em
+# milissegundos) e, conforme o modo:
+# - cprofile (padrão): também <tarefa>.prof, perfil determinístico para pstats ou snakeviz;
+#   as pilhas são reconstruídas do grafo de chamadas, repartindo o tempo de cada função entre
+#   quem a chamou
+# - amostragem: só as pilhas, amostradas de fato; pesa menos na execução. A partir do Python
+#   3.12 o cProfile vê todas as threads (inclusive a do amostrador), por isso não se misturam
+PASTA_PERFIL = os.path.join('outputs', '_profile')
+MODOS_PERFIL = ['cprofile', 'amostragem']
+
+# Intervalo entre as amostras de pilha, em segundos
+INTERVALO_AMOSTRAS = 0.005
+
+class Amostrador:
+    # Amostra periodicamente a pilha da thread que entrou no bloco, até o quadro raiz informado;
+    # cada pilha acumula o tempo decorrido desde a amostra anterior
+    def __init__(self, raiz, intervalo=INTERVALO_AMOSTRAS):
+        self.raiz = raiz
+        self.intervalo = intervalo
+        self.pilhas = Counter()
+
+    def __enter__(self):
+        self.alvo = threading.get_ident()
+        self.parar = threading.Event()
+        self.thread = threading.Thread(target=self.amostrar, daemon=True)
+        self.thread.start()
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        self.parar.set()
+        self.thread.join()
+        return False
+
+    def amostrar(self):
+        anterior = time.perf_counter()
+        while not self.parar.wait(self.intervalo):
+            agora = time.perf_counter()
+            frame = sys._current_frames().get(self.alvo)
+            if frame is not None:
+                self.pilhas[pilha(frame, self.raiz)] += max(1, round((agora - anterior) * 1000))
+            anterior = agora
+
+def rotulo(arquivo, numero, funcao):
+    # Nome de uma função nas pilhas e no resumo: "funcao (arquivo.py:linha)"
+    local = f'{os.path.basename(arquivo)}:{numero}' if numero else arquivo
+    return f'{funcao} ({local})'
+
+def pilha(frame, raiz=None):
+    # Da raiz (exclusive) à função em execução, no formato recolhido ("a;b;c")
+    nomes = []
+    while frame is not None and frame is not raiz:
+        codigo = frame.f_code
+        nomes.append(rotulo(codigo.co_filename, codigo.co_firstlineno, codigo.co_name))
+        frame = frame.f_back
+    return ';'.join(reversed(nomes))
+
+def pilhas_cprofile(stats):
+    # Pilhas recolhidas a partir do grafo de chamadas do cProfile, em milissegundos. Cada função
+    # entra em cada caminho com a fração do seu tempo acumulado que veio do chamador anterior
+    # (mesma hipótese do gprof); ciclos de recursão são cortados e caminhos abaixo de 1 ms, podados
+    chamadas = {}
+    for funcao, (_, _, _, _, chamadores) in stats.items():
+        for chamador, (_, _, _, acumulado) in chamadores.items():
+            chamadas.setdefault(chamador, []).append((funcao, acumulado))
+
+    pilhas = Counter()
+    atribuido = Counter()
+
+    def percorrer(funcao, caminho, fracao, visitadas):
+        proprio = stats[funcao][2] * fracao
+        pilhas[caminho] += proprio * 1000
+        atribuido[funcao] += proprio
+        for filha, tempo in chamadas.get(funcao, []):
+            total = stats[filha][3]
+            if filha in visitadas or total <= 0 or tempo * fracao < 0.001:
+                continue
+            percorrer(filha, f'{caminho};{rotulo(*filha)}', fracao * min(1.0, tempo / total), visitadas | {filha})
+
+    # Raízes: funções sem chamador registrado (a função da tarefa e o disable do perfil)
+    for funcao, (_, _, _, _, chamadores) in stats.items():
+        if not any(chamador in stats for chamador in chamadores):
+            percorrer(funcao, rotulo(*funcao), 1.0, {funcao})
+
+    # Tempo próprio que não chegou a nenhum caminho (podado, ou arestas que o cProfile perdeu)
+    # entra pela sequência dos chamadores mais pesados de cada função
+    for funcao, (_, _, proprio, _, _) in stats.items():
+        restante = proprio - atribuido[funcao]
+        if restante * 1000 < 0.5:
+            continue
+        cadeia = [funcao]
+        while True:
+            chamadores = [c for c in stats[cadeia[-1]][4] if c in stats and c not in cadeia]
+            if not chamadores:
+                break
+            cadeia.append(max(chamadores, key=lambda c: stats[cadeia[-1]][4][c][3]))
+        pilhas[';'.join(rotulo(*f) for f in reversed(cadeia))] += restante * 1000
+    return pilhas
+
+def gravar_pilhas(caminho, nome, pilhas):
+    # Pilhas com o nome da tarefa na raiz; pesos inteiros, em milissegundos
+    with open(caminho, 'w', encoding='utf-8') as f:
+        f.writelines(f'{nome};{linha} {round(peso)}\n' for linha, peso in pilhas.items() if linha and round(peso) > 0)
+
+def perfilado(nome, funcao, modo='cprofile', pasta=PASTA_PERFIL):
+    # Mesma função, executada sob o perfilador do modo escolhido
+    @functools.wraps(funcao)
+    def executar(*args, **kwargs):
+        os.makedirs(pasta, exist_ok=True)
+        if modo == 'cprofile':
+            perfil = cProfile.Profile()
+            perfil.enable()
+            try:
+                return funcao(*args, **kwargs)
+            finally:
+                perfil.disable()
+                perfil.dump_stats(os.path.join(pasta, f'{nome}.prof'))
+                gravar_pilhas(os.path.join(pasta, f'{nome}.folded'), nome, pilhas_cprofile(pstats.Stats(perfil).stats))
+
+        # As pilhas começam na função da tarefa
+        amostrador = Amostrador(sys._getframe())
+        try:
+            with amostrador:
+                return funcao(*args, **kwargs)
+        finally:
+            gravar_pilhas(os.path.join(pasta, f'{nome}.folded'), nome, amostrador.pilhas)
+    return executar
+
+def limpar_perfis(pasta=PASTA_PERFIL):
+    # Perfis de execuções anteriores não entram no resumo desta
+    for arquivo in glob.glob(os.path.join(pasta, '*.prof')) + glob.glob(os.path.join(pasta, '*.folded')):
+        os.remove(arquivo)
+
+#### RESUMO ####
+def ler_pilhas(arquivo):
+    with open(arquivo, 'r', encoding='utf-8') as f:
+        for linha in f:
+            quadros, _, peso = linha.rstrip('\n').rpartition(' ')
+            yield quadros.split(';'), int(peso)
+
+def pontos_quentes_amostrados(arquivos):
+    # Tempo próprio (função no topo da pilha) e acumulado (função em qualquer ponto), em segundos
+    proprio, acumulado, totais = Counter(), Counter(), {}
+    for arquivo in arquivos:
+        total = 0
+        for quadros, peso in ler_pilhas(arquivo):
+            total += peso
+            proprio[quadros[-1]] += peso
+            for quadro in set(quadros[1:]):
+                acumulado[quadro] += peso
+        totais[os.path.basename(arquivo).rsplit('.', 1)[0]] = total / 1000
+    linhas = [(funcao, segundos / 1000, acumulado[funcao] / 1000, None) for funcao, segundos in proprio.items()]
+    return linhas, totais
+
+def pontos_quentes_cprofile(arquivos):
+    linhas = []
+    for chave, (_, chamadas, proprio, acumulado, _) in pstats.Stats(*arquivos).stats.items():
+        linhas.append((rotulo(*chave), proprio, acumulado, chamadas))
+    totais = {os.path.basename(arquivo).rsplit('.', 1)[0]: pstats.Stats(arquivo).total_tt for arquivo in arquivos}
+    return linhas, totais
+
+def imprimir_pontos_quentes(pasta=PASTA_PERFIL, top=20):
+    # Funções com maior tempo próprio, somando todas as tarefas perfiladas
+    amostrados = sorted(glob.glob(os.path.join(pasta, '*.folded')))
+    deterministicos = sorted(glob.glob(os.path.join(pasta, '*.prof')))
+    if not amostrados and not deterministicos:
+        print("Nenhuma tarefa perfilada.")
+        return
+
+    linhas, totais = pontos_quentes_cprofile(deterministicos) if deterministicos else pontos_quentes_amostrados(amostrados)
+    print(f"Pontos quentes de {len(totais)} tarefa(s) perfilada(s) (perfis em {pasta}):")
+    print(f"{'próprio (s)':>12} {'acumulado (s)':>14} {'chamadas':>10}  função")
+    for funcao, proprio, acumulado, chamadas in sorted(linhas, key=lambda linha: -linha[1])[:top]:
+        print(f"{proprio:12.3f} {acumulado:14.3f} {'' if chamadas is None else chamadas:>10}  {funcao}")
+
+    # Tarefas mais demoradas, pelo tempo total do perfil de cada uma
+    maiores = sorted(totais.items(), key=lambda par: -par[1])[:5]
+    print("Tarefas perfiladas mais demoradas: " + ', '.join(f'{nome} ({segundos:.2f}s)' for nome, segundos in maiores))
@@ -0,0 +1,154 @@
+import os
+import json
+import time
+import functools
+import threading
+from memoria import rss_mb, pico_rss_mb
+
+#### RASTREIO DAS ETAPAS ####
+# Trechos cronometrados (tempo, CPU, linhas, bytes gravados, RSS ao entrar e ao sair) no formato
+# de eventos do Chrome, que abre em chrome://tracing ou https://ui.perfetto.dev. Desligado
+# (padrão), trecho() devolve sempre o mesmo objeto vazio e nada é medido
+
+_ativo = False
+_eventos = []
+_trava = threading.Lock()
+_processo = os.getpid()
+
+def ativar(ligado=True):
+    global _ativo, _processo
+    _ativo = ligado
+
+    # Processos de trabalho criados por fork herdam os eventos já registrados no principal
+    if _processo != os.getpid():
+        _processo = os.getpid()
+        with _trava:
+            _eventos.clear()
+
+def ativo():
+    return _ativo
+
+class Trecho:
+    def __init__(self, nome, categoria, atributos):
+        self.nome = nome
+        self.categoria = categoria
+        self.atributos = atributos
+
+    def registrar(self, **atributos):
+        # Atributos conhecidos só durante o trecho (ex.: linhas lidas, bytes gravados)
+        self.atributos.update(atributos)
+
+    def __enter__(self):
+        self.rss = rss_mb()
+        self.inicio = time.time_ns()
+        self.cpu = time.process_time()
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        fim = time.time_ns()
+        args = dict(self.atributos, cpu_ms=round((time.process_time() - self.cpu) * 1000, 3))
+        # Memória residente do processo ao entrar e ao sair do trecho (o pico ao longo da vida do
+        # processo não diria nada sobre a etapa; vai só nos metadados do arquivo)
+        rss = rss_mb()
+        if rss is not None and self.rss is not None:
+            args['rss_inicio_mb'] = round(self.rss, 1)
+            args['rss_fim_mb'] = round(rss, 1)
+            args['variacao_rss_mb'] = round(rss - self.rss, 1)
+        if tipo is not None:
+            args['erro'] = f'{tipo.__name__}: {erro}'
+
+        evento = {
+            'name': self.nome,
+            'cat': self.categoria,
+            'ph': 'X',
+            'ts': self.inicio / 1000,
+            'dur': (fim - self.inicio) / 1000,
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': args,
+        }
+        with _trava:
+            _eventos.append(evento)
+        return False
+
+class TrechoVazio:
+    def registrar(self, **atributos):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, tipo, erro, tb):
+        return False
+
+_VAZIO = TrechoVazio()
+
+def trecho(nome, categoria='etapa', **atributos):
+    # with trecho('nome') as t: ...; t.registrar(linhas=...)
+    if not _ativo:
+        return _VAZIO
+    return Trecho(nome, categoria, atributos)
+
+def rastreado(nome=None, categoria='etapa'):
+    # Decorador: cada chamada da função vira um trecho
+    def decorar(funcao):
+        rotulo = nome or funcao.__name__
+
+        @functools.wraps(funcao)
+        def envolvida(*args, **kwargs):
+            if not _ativo:
+                return funcao(*args, **kwargs)
+            with Trecho(rotulo, categoria, {}):
+                return funcao(*args, **kwargs)
+        return envolvida
+    return decorar
+
+#### COLETA E GRAVAÇÃO ####
+def descarregar():
+    # Retira os eventos registrados neste processo (ex.: para enviá-los ao processo principal)
+    with _trava:
+        eventos = list(_eventos)
+        _eventos.clear()
+    return eventos
+
+def incorporar(eventos):
+    # Eventos vindos dos processos de trabalho
+    with _trava:
+        _eventos.extend(eventos)
+
+def resumir(eventos):
+    # Tempo total, CPU e número de chamadas por trecho, do mais demorado ao mais rápido
+    resumo = {}
+    for evento in eventos:
+        item = resumo.setdefault(evento['name'], {'categoria': evento['cat'], 'chamadas': 0, 'tempo_ms': 0.0, 'cpu_ms': 0.0})
+        item['chamadas'] += 1
+        item['tempo_ms'] += evento['dur'] / 1000
+        item['cpu_ms'] += evento['args'].get('cpu_ms', 0.0)
+    return dict(sorted(resumo.items(), key=lambda par: -par[1]['tempo_ms']))
+
+def gravar(caminho, metadados=None):
+    # Arquivo de eventos do Chrome, com os nomes dos processos e um resumo por trecho
+    eventos = descarregar()
+    principal = os.getpid()
+
+    # Pico de memória do processo principal em toda a execução
+    metadados = dict(metadados or {})
+    pico = pico_rss_mb()
+    if pico is not None:
+        metadados['pico_rss_mb_principal'] = round(pico, 1)
+
+    nomes = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+              'args': {'name': 'principal' if pid == principal else f'trabalho {pid}'}}
+             for pid in sorted({evento['pid'] for evento in eventos})]
+
+    dados = {
+        'traceEvents': nomes + sorted(eventos, key=lambda evento: evento['ts']),
+        'displayTimeUnit': 'ms',
+        'otherData': {chave: str(valor) for chave, valor in metadados.items()},
+        'resumo': resumir(eventos),
+    }
+    os.makedirs(os.path.dirname(caminho) or '.', exist_ok=True)
+    with open(caminho + '.tmp', 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False)
+    os.replace(caminho + '.tmp', caminho)
+    return caminho
@@ -0,0 +1,133 @@
+import os
+import json
+import pandas as pd
+from base_indexada import BaseIndexada
+from agendador import Tarefa, Resultado
+from helpers import (criar_resumo, criar_resumos_destaque, criar_barra_status, criar_barra_status_prj,
+                     criar_barra_resp_prc, criar_barra_resp_prc_destaq, criar_barra_resp_prc_fin,
+                     criar_barra_resp_prj, criar_barra_resp_obr, criar_barra_resp_prospec,
+                     criar_justificativas, create_map)
+
+# Subpastas criadas para cada ciclo e para os mapas
+SUBPASTAS_CICLO = ['entregues', 'justificativas', 'resumos', 'status', 'status_det']
+SUBPASTAS_MAPAS = ['pizzas']
+
+#### ESPECIFICAÇÃO DO RELATÓRIO ####
+def carregar_relatorio(caminho):
+    # Ciclos do PLANINFRA, imagens geradas para cada ciclo e imagens gerais (ver relatorio.json)
+    with open(caminho, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def ciclos_planinfra(relatorio):
+    # Pares (trecho da INSCRIÇÃO, rótulo do PLANINFRA), na ordem em que são testados
+    return [(ciclo['inscricao'], ciclo['planinfra']) for ciclo in relatorio['ciclos']]
+
+def criar_pastas(relatorio, base_dir):
+    # Uma pasta por ano de ciclo, mais a dos mapas
+    for ciclo in relatorio['ciclos']:
+        for subpasta in SUBPASTAS_CICLO:
+            os.makedirs(os.path.join(base_dir, ciclo['ano'], subpasta), exist_ok=True)
+    for subpasta in SUBPASTAS_MAPAS:
+        os.makedirs(os.path.join(base_dir, 'mapas', subpasta), exist_ok=True)
+
+#### TIPOS DE IMAGEM ####
+# Cada tipo recebe a entrada do relatório (já formatada para o ciclo), o ano do ciclo e os
+# recortes da base e do cubo, e devolve as tarefas que geram as imagens
+
+def tarefas_do_cubo(funcao):
+    # Funções no formato (cubo, ano, arquivo, título)
+    def montar(entrada, ano, recorte):
+        return [Tarefa(entrada['tarefa'], funcao, (recorte.cubo(), ano, entrada['arquivo'], entrada['titulo']))]
+    return montar
+
+def tarefas_resumos_destaque(entrada, ano, recorte):
+    # Um resumo por STATUS_Ext do ciclo, com os status do grupo combinado destacados juntos
+    cubo = recorte.cubo()
+    grupo_combinado = entrada['grupo_combinado']
+    lista_status = [grupo_combinado] + [[item] for item in cubo['STATUS_Ext'].unique().tolist() if item not in grupo_combinado]
+    destaques = [(f"{entrada['arquivo']}_{item[0].replace('(', '').replace(')', '')[-3:]}", item) for item in lista_status]
+    return [Tarefa(entrada['tarefa'], criar_resumos_destaque, (cubo, ano, destaques, entrada['titulo']))]
+
+def tarefas_barra_resp_prc_destaq(entrada, ano, recorte):
+    # Lê o cubo e as linhas do recorte (para as listas de cada grupo); as listas destacam
+    # os TEP assinados nos 30 dias anteriores à data de referência
+    return [Tarefa(entrada['tarefa'], criar_barra_resp_prc_destaq, (recorte.cubo(), recorte.df(), ano, entrada['arquivo'], entrada['titulo']),
+                   {'data_referencia': recorte.data_referencia.normalize()})]
+
+def tarefas_justificativas(entrada, ano, recorte):
+    # Opcional: linhas_por_pagina divide tabelas grandes em páginas; emendar também as une numa imagem
+    opcoes = {chave: entrada[chave] for chave in ['linhas_por_pagina', 'emendar'] if chave in entrada}
+    return [Tarefa(entrada['tarefa'], criar_justificativas, (recorte.df(), ano, entrada['arquivo']), opcoes)]
+
+def tarefas_carga_elos(funcao):
+    # Gráficos gerais por elo; as pizzas retornadas alimentam o mapa, se houver
+    def montar(entrada, ano, recorte):
+        tarefas = [Tarefa(entrada['tarefa'], funcao, (recorte.cubo(), entrada['arquivo'], entrada['titulo']),
+                          {'salvar_pizzas': recorte.salvar_pizzas})]
+        if entrada.get('mapa'):
+            tarefas.append(Tarefa(entrada['mapa'], create_map, (Resultado(entrada['tarefa'], 1), entrada['mapa'])))
+        return tarefas
+    return montar
+
+TIPOS = {
+    'resumo': tarefas_do_cubo(criar_resumo),
+    'resumos_destaque': tarefas_resumos_destaque,
+    'barra_status': tarefas_do_cubo(criar_barra_status),
+    'barra_status_prj': tarefas_do_cubo(criar_barra_status_prj),
+    'barra_resp_prc': tarefas_do_cubo(criar_barra_resp_prc),
+    'barra_resp_prc_destaq': tarefas_barra_resp_prc_destaq,
+    'barra_resp_prc_fin': tarefas_do_cubo(criar_barra_resp_prc_fin),
+    'barra_resp_prj': tarefas_carga_elos(criar_barra_resp_prj),
+    'barra_resp_obr': tarefas_carga_elos(criar_barra_resp_obr),
+    'barra_resp_prospec': tarefas_carga_elos(criar_barra_resp_prospec),
+    'justificativas': tarefas_justificativas,
+}
+
+#### PLANEJAMENTO DAS TAREFAS ####
+class Recorte:
+    # Recortes da base e do cubo para um filtro, calculados só se o tipo de imagem os usar
+    def __init__(self, base, cubo, filtro, salvar_pizzas, data_referencia):
+        self.base = base
+        self.cubo_indexado = cubo
+        self.filtro = filtro
+        self.salvar_pizzas = salvar_pizzas
+        self.data_referencia = data_referencia
+
+    def df(self):
+        return self.base.recortar(self.filtro)
+
+    def cubo(self):
+        return self.cubo_indexado.recortar(self.filtro)
+
+def formatar_entrada(entrada, ciclo):
+    # Nomes e títulos podem usar os campos do ciclo, como {sufixo} e {periodo}
+    entrada = {chave: valor.format(**ciclo) if isinstance(valor, str) else valor for chave, valor in entrada.items()}
+    entrada.setdefault('arquivo', entrada['tarefa'])
+    entrada.setdefault('titulo', None)
+    return entrada
+
+def normalizar_filtro(filtro):
+    # Aceita um valor único ou uma lista de valores por coluna
+    return {coluna: valores if isinstance(valores, list) else [valores] for coluna, valores in (filtro or {}).items()}
+
+def planejar_tarefas(relatorio, base, cubo, salvar_pizzas=False, data_referencia=None):
+    # Tarefas de todas as imagens do relatório, na ordem da especificação. A base já vem
+    # indexada; o cubo é indexado aqui pelas mesmas dimensões
+    cubo = BaseIndexada(cubo)
+    if data_referencia is None:
+        data_referencia = pd.Timestamp.today()
+
+    entradas = []
+    for entrada in relatorio.get('por_ciclo', []):
+        for ciclo in relatorio['ciclos']:
+            filtro = {'PLANINFRA': [ciclo['planinfra']], **normalizar_filtro(entrada.get('filtro'))}
+            entradas.append((formatar_entrada(entrada, ciclo), ciclo['ano'], filtro))
+    for entrada in relatorio.get('gerais', []):
+        entradas.append((formatar_entrada(entrada, {}), None, normalizar_filtro(entrada.get('filtro'))))
+
+    tarefas = []
+    for entrada, ano, filtro in entradas:
+        if entrada['tipo'] not in TIPOS:
+            raise ValueError(f"Tipo de imagem desconhecido: '{entrada['tipo']}' (tarefa {entrada['tarefa']})")
+        tarefas.extend(TIPOS[entrada['tipo']](entrada, ano, Recorte(base, cubo, filtro, salvar_pizzas, data_referencia)))
+    return tarefas
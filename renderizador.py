@@ -0,0 +1,138 @@
+import os
+import io
+import atexit
+import shutil
+import imgkit
+from concurrent.futures import ThreadPoolExecutor
+from rastreio import trecho
+
+# Navegador headless opcional (pip install -r requirements-opcionais.txt && playwright install chromium)
+try:
+    from playwright.sync_api import sync_playwright
+except ImportError:
+    sync_playwright = None
+
+def threads_renderizacao():
+    # Conversões simultâneas num lote: THREADS_HTML, ou o número de CPUs
+    return int(os.getenv('THREADS_HTML', '0')) or os.cpu_count() or 1
+
+#### BACKEND WKHTMLTOIMAGE ####
+class RenderizadorImgkit:
+    # Um processo wkhtmltoimage por imagem, com o HTML pela entrada padrão e o PNG pela saída padrão
+    @staticmethod
+    def disponivel():
+        return shutil.which('wkhtmltoimage') is not None
+
+    def para_png(self, html_output, largura=500):
+        # Configurações para gerar a imagem
+        img_options = {
+            'format': 'png',
+            'encoding': 'UTF-8',
+            'width': largura,
+            'quiet': '',
+        }
+        with trecho('wkhtmltoimage', 'html', bytes_html=len(html_output)):
+            return imgkit.from_string(html_output, False, options=img_options)
+
+    def lote_para_png(self, documentos, max_threads=None):
+        # Os processos wkhtmltoimage do lote rodam simultaneamente
+        max_threads = max_threads or threads_renderizacao()
+        with ThreadPoolExecutor(max_workers=max(1, min(max_threads, len(documentos)))) as executor:
+            return list(executor.map(lambda doc: self.para_png(*doc), documentos))
+
+    def fechar(self):
+        pass
+
+#### BACKEND CHROMIUM (PLAYWRIGHT) ####
+class RenderizadorChromium:
+    # Um único navegador fica aberto e cada imagem é só uma nova página
+    @staticmethod
+    def disponivel():
+        return sync_playwright is not None
+
+    def __init__(self):
+        if sync_playwright is None:
+            raise ImportError("O renderizador 'chromium' requer o pacote playwright.")
+        self.playwright = sync_playwright().start()
+        self.navegador = self.playwright.chromium.launch()
+
+    def para_png(self, html_output, largura=500):
+        with trecho('chromium', 'html', bytes_html=len(html_output)):
+            pagina = self.navegador.new_page(viewport={'width': largura, 'height': 1})
+            try:
+                pagina.set_content(html_output)
+                return pagina.screenshot(full_page=True)
+            finally:
+                pagina.close()
+
+    def lote_para_png(self, documentos, max_threads=None):
+        # A API síncrona do Playwright não é thread-safe: o lote é sequencial no mesmo navegador
+        return [self.para_png(*doc) for doc in documentos]
+
+    def fechar(self):
+        self.navegador.close()
+        self.playwright.stop()
+
+#### SELEÇÃO DO BACKEND ####
+RENDERIZADORES = {
+    'imgkit': RenderizadorImgkit,
+    'chromium': RenderizadorChromium,
+}
+
+# Um renderizador por processo, reaproveitado entre as tabelas
+_renderizador = None
+
+def nome_renderizador():
+    nome = os.getenv('RENDERIZADOR_HTML', 'imgkit')
+    if nome not in RENDERIZADORES:
+        raise ValueError(f"Renderizador HTML desconhecido: '{nome}'. Opções: {list(RENDERIZADORES)}")
+    return nome
+
+def renderizador_disponivel():
+    # O backend escolhido (ou o wkhtmltoimage, para onde ele recai) pode ser usado neste sistema?
+    return RENDERIZADORES[nome_renderizador()].disponivel() or RenderizadorImgkit.disponivel()
+
+def obter_renderizador():
+    global _renderizador
+    if _renderizador is None:
+        nome = nome_renderizador()
+        try:
+            _renderizador = RENDERIZADORES[nome]()
+        except Exception as erro:
+            # Sem o playwright ou sem o navegador instalado, as tabelas saem pelo wkhtmltoimage
+            if nome == 'imgkit':
+                raise
+            print(f"Renderizador HTML '{nome}' indisponível ({str(erro).splitlines()[0]}): usando o wkhtmltoimage.")
+            _renderizador = RenderizadorImgkit()
+    return _renderizador
+
+def fechar_renderizador():
+    global _renderizador
+    if _renderizador is not None:
+        _renderizador.fechar()
+        _renderizador = None
+
+atexit.register(fechar_renderizador)
+
+#### API ####
+def html_para_png(html_output, largura=500):
+    # Retorna o PNG em memória (bytes), sem arquivos intermediários
+    return obter_renderizador().para_png(html_output, largura)
+
+def html_para_buffer(html_output, largura=500):
+    # Mesmo PNG, como buffer para ser lido ou transmitido pelo chamador
+    return io.BytesIO(html_para_png(html_output, largura))
+
+def gravar_png(png, img_output):
+    with open(img_output, 'wb') as f:
+        f.write(png)
+    return img_output
+
+def renderizar_html(html_output, img_output, largura=500):
+    # Converter o HTML em imagem (PNG) e salvar no caminho indicado
+    return gravar_png(html_para_png(html_output, largura), img_output)
+
+def renderizar_lote(documentos, max_threads=None):
+    # documentos: lista de tuplas (html, caminho da imagem, largura)
+    pngs = obter_renderizador().lote_para_png([(html, largura) for html, _, largura in documentos], max_threads)
+    return [gravar_png(png, img_output) for png, (_, img_output, _) in zip(pngs, documentos)]
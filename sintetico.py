@@ -0,0 +1,85 @@
+import sys
+import numpy as np
+import pandas as pd
+from moeda import formatar_brl
+
+# Dados fictícios no formato da aba base_looker, para rodar e medir o relatório sem acesso à planilha
+
+# Status, descrição (STATUS_Ext) e Ordem_Status
+STATUS = {
+    'AGD': ('Aguardando início (AGD)', 1),
+    'PRI': ('Projeto Iniciado (PRI)', 2),
+    'PII': ('Projeto Interrompido (PII)', 3),
+    'PSP': ('Projeto Suspenso (PSP)', 4),
+    'PCN': ('Projeto Cancelado (PCN)', 5),
+    'PRC': ('Projeto Concluído (PRC)', 6),
+    'LIA': ('Licitação Autorizada (LIA)', 7),
+    'OBI': ('Obra Iniciada (OBI)', 8),
+    'OSP': ('Obra Suspensa (OSP)', 9),
+    'OBC': ('Obra Concluída (OBC)*', 10),
+    'OCN': ('Obra Cancelada com Projeto Concluído (OCN)', 11),
+}
+INSCRICOES = ['PLANINFRA 2023/2024', 'PLANINFRA 2024/2025', 'PLANINFRA 2025/2026', 'PLANINFRA 2022/2023', 'Encerrado']
+RESPONSAVEIS = ['CEPE', 'SR-BE', 'SR-BR', 'SR-CO', 'SR-MN', 'SR-NT', 'SR-RJ', 'SR-SJ', 'GAC-AN', 'COMARA', 'GECAMP', 'CO-FZ', 'DIRENG', 'XYZ']
+OMS = ['BAAN', 'BABR', 'BACG', 'GAP-RJ']
+
+# A aba vai da coluna A até a BE
+TOTAL_COLUNAS = 57
+
+#### GERAÇÃO ####
+def datas_texto(rng, hoje, linhas, vazias):
+    # Datas dd/mm/aaaa até 400 dias antes ou depois de hoje, com uma fração de células vazias
+    dias = pd.date_range(hoje - pd.Timedelta(days=400), hoje + pd.Timedelta(days=399)).strftime('%d/%m/%Y').to_numpy()
+    datas = dias[rng.integers(0, len(dias), linhas)]
+    return np.where(rng.random(linhas) < vazias, '', datas)
+
+def gerar_base_looker(linhas, semente=0, hoje=None):
+    # DataFrame como o entregue pela planilha: tudo texto, células vazias como ''
+    rng = np.random.default_rng(semente)
+    hoje = pd.Timestamp.today().normalize() if hoje is None else pd.Timestamp(hoje)
+
+    status = rng.choice(list(STATUS), linhas)
+    valores = rng.uniform(-1e5, 5e6, linhas)
+    dados = {
+        'ID-PW': (rng.permutation(linhas) + 1000).astype(str),
+        'INSCRIÇÃO': rng.choice(INSCRICOES, linhas),
+        'STATUS': status,
+        'STATUS_Ext': pd.Series(status).map({s: d for s, (d, _) in STATUS.items()}).to_numpy(),
+        'Ordem_Status': pd.Series(status).map({s: str(o) for s, (_, o) in STATUS.items()}).to_numpy(),
+        'VALOR': np.where(valores > 0, formatar_brl(pd.Series(valores)).to_numpy(), ''),
+        'Data de entrega do Projeto': datas_texto(rng, hoje, linhas, 0.6),
+        'INÍCIO_PTA': datas_texto(rng, hoje, linhas, 0.2),
+        'TÉRMINO_PTA': datas_texto(rng, hoje, linhas, 0.2),
+        'PRAZO PROJETO VIGENTE': datas_texto(rng, hoje, linhas, 0.4),
+        'OM': rng.choice(OMS, linhas),
+        'DESCRIÇÃO': np.char.add('Obra ', np.arange(linhas).astype(str)),
+        'CN': rng.choice(['0', '1', ''], linhas),
+        'ETPE': rng.choice(['0', '1'], linhas),
+        'TAP ass': rng.choice(['0', '1'], linhas),
+        'TEP ass': rng.choice(['0', '1', ''], linhas),
+        'RECURSO': rng.choice(['LOA', 'Extra'], linhas),
+        'RESPONSAVEL PROJETO': rng.choice(['Fulano', 'Beltrano'], linhas),
+        'Justificativa': rng.choice(['', 'Aguardando licença', 'Atraso'], linhas),
+        '%PRJ': rng.integers(0, 101, linhas).astype(str),
+        'RESP_PRJ_Abr': rng.choice(RESPONSAVEIS, linhas),
+        'RESP_Fisc_Abr': rng.choice(RESPONSAVEIS, linhas),
+        'DATA de assinatura do TEP pelo cliente': datas_texto(rng, hoje, linhas, 0.5),
+    }
+    df = pd.DataFrame({coluna: pd.Series(valores, dtype=object) for coluna, valores in dados.items()})
+
+    # Demais colunas da aba, que o relatório não usa
+    extras = {f'COLUNA_{i}': 'x' for i in range(len(df.columns) + 1, TOTAL_COLUNAS + 1)}
+    return df.assign(**extras)
+
+if __name__ == '__main__':
+    # python sintetico.py <linhas> <arquivo .csv/.parquet/.xlsx> [semente]
+    linhas, caminho = int(sys.argv[1]), sys.argv[2]
+    semente = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+    df = gerar_base_looker(linhas, semente)
+    if caminho.endswith('.csv'):
+        df.to_csv(caminho, index=False)
+    elif caminho.endswith('.parquet'):
+        df.to_parquet(caminho, index=False)
+    else:
+        df.to_excel(caminho, index=False)
+    print(f"{linhas} linhas gravadas em {caminho}.")
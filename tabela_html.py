@@ -0,0 +1,48 @@
+import numpy as np
+
+#### TABELAS HTML ####
+# As células são geradas coluna a coluna (uma operação por coluna, sem iterrows), as linhas
+# são montadas somando as colunas e a tabela sai de um único join
+
+# Barra de progresso da coluna %PRJ
+BARRA_PROGRESSO = '''
+                <td>
+                    <div class="progress-bar">
+                        <div class="progress-bar-fill" style="width: {0}%;">{0}%</div>
+                    </div>
+                </td>'''
+
+def textos(serie):
+    # Valores como aparecem na célula (mesmo resultado de f'{valor}')
+    return serie.astype(str).to_numpy(dtype=object)
+
+def celulas(serie, classes=None):
+    # Células <td> de uma coluna; classes (opcional) traz a classe CSS de cada célula ('' = nenhuma)
+    if classes is None:
+        return '<td>' + textos(serie) + '</td>'
+    aberturas = np.where(classes == '', '<td>', '<td class="' + classes.astype(object) + '">')
+    return aberturas.astype(object) + textos(serie) + '</td>'
+
+def celulas_indicador(serie):
+    # Indicadores 0/1 (CN, ETPE, TAP, TEP): azul para 1, vermelho para 0
+    valores = serie.to_numpy()
+    classes = np.where(valores == 1, 'cn-blue', np.where(valores == 0, 'cn-red', ''))
+    return celulas(serie, classes)
+
+def celulas_progresso(serie):
+    # Barra de progresso com o percentual (%PRJ)
+    partes = BARRA_PROGRESSO.split('{0}')
+    valores = textos(serie)
+    return partes[0] + valores + partes[1] + valores + partes[2]
+
+def montar_tabela(colunas, cabecalho, abertura='<table class="main-table">', aberturas_linhas='<tr>'):
+    # colunas: células de cada coluna, na ordem do cabeçalho; aberturas_linhas: tag <tr> única
+    # ou uma por linha (ex.: com a classe de destaque)
+    linhas = aberturas_linhas
+    for coluna in colunas:
+        linhas = linhas + coluna
+    linhas = linhas + '</tr>'
+
+    thead = '<thead><tr>' + ''.join(f'<th>{titulo}</th>' for titulo in cabecalho) + '</tr></thead>'
+    corpo = ''.join(linhas) if len(colunas) and len(colunas[0]) else ''
+    return f'{abertura}{thead}<tbody>{corpo}</tbody></table>'